@@ -0,0 +1,106 @@
+"""Incremental checkpoint of processed files for resuming interrupted runs."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.config import get_runs_dir
+
+from . import jsonx
+
+CHECKPOINT_FILENAME = "contexts.jsonl"
+INVENTORY_FILENAME = "inventory.xlsx"
+# Параметри запуску (режим тощо) - відновлення повторює їх
+RUN_INFO_FILENAME = "run.json"
+# Позначка, що запуск уже завершено іншим (відновленим) запуском; вміст - id нового запуску
+RESUMED_FILENAME = "resumed_by"
+
+
+class ContextCheckpoint:
+    """Журнал (JSONL) оброблених файлів запуску, що дописується по одному рядку на файл."""
+
+    def __init__(self, run_dir: Path):
+        run_dir.mkdir(parents=True, exist_ok=True)
+        self.path = run_dir / CHECKPOINT_FILENAME
+        self._file = self.path.open("a", encoding="utf-8", buffering=1 << 16)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(jsonx.dumps(record) + "\n")
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+def load_checkpoint(run_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Прочитати журнал запуску.
+
+    Пошкоджені рядки (наприклад, обірваний останній запис) пропускаються.
+
+    Returns:
+        Мапа {шлях_файлу: запис}
+    """
+    path = run_dir / CHECKPOINT_FILENAME
+    records: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return records
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = jsonx.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "path" in record:
+                records[record["path"]] = record
+    return records
+
+
+def write_run_info(run_dir: Path, info: Dict[str, Any]) -> None:
+    """Зберегти параметри запуску, щоб відновлення виконувалось у тому самому режимі."""
+    run_dir.mkdir(parents=True, exist_ok=True)
+    (run_dir / RUN_INFO_FILENAME).write_bytes(jsonx.dumps_indented(info))
+
+
+def load_run_info(run_dir: Path) -> Dict[str, Any]:
+    """Прочитати параметри запуску (порожній словник для запусків без run.json)."""
+    try:
+        info = jsonx.loads((run_dir / RUN_INFO_FILENAME).read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return info if isinstance(info, dict) else {}
+
+
+def mark_resumed(run_dir: Path, resumed_by: str) -> None:
+    """Позначити перерваний запуск як завершений відновленим запуском resumed_by."""
+    (run_dir / RESUMED_FILENAME).write_text(resumed_by, encoding="utf-8")
+
+
+def find_resumable_run() -> Optional[Path]:
+    """
+    Знайти останній запуск, який має журнал, але не дійшов до запису інвентаризації.
+
+    Запуски, вже завершені відновленням, пропускаються.
+    """
+    runs_dir = get_runs_dir()
+    if not runs_dir.exists():
+        return None
+    for run_dir in sorted((p for p in runs_dir.iterdir() if p.is_dir()), reverse=True):
+        if (
+            (run_dir / CHECKPOINT_FILENAME).exists()
+            and not (run_dir / INVENTORY_FILENAME).exists()
+            and not (run_dir / RESUMED_FILENAME).exists()
+        ):
+            return run_dir
+    return None
+
+
+__all__ = [
+    "ContextCheckpoint",
+    "load_checkpoint",
+    "write_run_info",
+    "load_run_info",
+    "mark_resumed",
+    "find_resumable_run",
+    "CHECKPOINT_FILENAME",
+]
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import re
 from datetime import datetime
-from typing import Dict, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .llm_client import LLMClient
@@ -55,7 +55,41 @@ def classify_text(
                 "summary": llm_summary,
             }
 
-    # Fallback: прості евристики
+    return _classify_by_keywords(text, default_category)
+
+
+def classify_texts(
+    texts: List[str],
+    default_category: str = "інше",
+    llm_client: Optional["LLMClient"] = None,
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Класифікувати кілька текстів, надсилаючи їх до LLM одним запитом.
+
+    Результат для кожного тексту такий самий, як дав би classify_text.
+    """
+    answers: List[Tuple[Optional[str], Optional[str], Optional[str]]] = [(None, None, None)] * len(texts)
+    if llm_client and llm_client.enabled:
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        if indices:
+            for i, answer in zip(indices, llm_client.analyze_documents([texts[i] for i in indices])):
+                answers[i] = answer
+
+    results = []
+    for text, (llm_category, llm_date, llm_summary) in zip(texts, answers):
+        if llm_category or llm_date:
+            results.append({
+                "category": llm_category or default_category,
+                "date_doc": llm_date,
+                "summary": llm_summary,
+            })
+        else:
+            results.append(_classify_by_keywords(text, default_category))
+    return results
+
+
+def _classify_by_keywords(text: str, default_category: str) -> Dict[str, Optional[str]]:
+    """Прості евристики: ключові слова категорій та перша дата в тексті."""
     category = default_category
     lowered = text.lower()
     for name, keywords in CATEGORY_KEYWORDS.items():
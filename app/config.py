@@ -111,6 +111,11 @@ class Config(BaseModel):
     llm_api_key_claude: str = ""
     llm_api_key_openai: str = ""
     llm_model: str = ""  # Наприклад: "claude-3-sonnet-20240229" або "gpt-4"
+    llm_concurrency: int = 4  # Скільки запитів до LLM виконуються паралельно
+    llm_min_text_chars: int = 20  # Коротший текст класифікується евристиками без запиту до LLM
+    llm_batch_size: int = 1  # Скільки документів надсилати в одному запиті до LLM (1 = по одному)
+    llm_cache: bool = True  # Повторно використовувати відповіді LLM для незмінного тексту
+    llm_cache_dir: str = ""  # Папка кешу відповідей LLM (порожньо = папка runs)
     threads: int = 0
 
     # Фільтри для сканування
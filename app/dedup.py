@@ -15,7 +15,7 @@ class DuplicateGroup:
     files: List[FileMeta]
 
     def canonical(self) -> FileMeta:
-        return sorted(self.files, key=lambda f: (f.mtime, len(str(f.path))))[0]
+        return min(self.files, key=lambda f: (f.mtime, len(str(f.path))))
 
 
 @dataclass
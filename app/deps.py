@@ -36,6 +36,9 @@ PACKAGE_IMPORT_MAP = {
 
 OPTIONAL_PACKAGES: Tuple[str, ...] = (
     "pypdf",
+    "orjson",
+    "xlsxwriter",
+    "pyarrow",
 )
 
 
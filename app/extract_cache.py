@@ -0,0 +1,167 @@
+"""Persistent cache of text extraction results keyed by file content hash."""
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import get_runs_dir
+
+from .extract import ExtractionResult
+from .scan import FileMeta
+
+# Збільшити при зміні логіки вилучення тексту, щоб інвалідувати старі записи
+EXTRACTOR_VERSION = 1
+CACHE_FILENAME = "extract_cache.db"
+# Межі розміру кешу: при перевищенні під час відкриття видаляються найдавніше використані
+# записи, доки не лишиться PRUNE_RATIO від межі (запас, щоб не чистити на кожному запуску)
+MAX_ROWS = 50_000
+MAX_TEXT_CHARS = 200_000_000
+PRUNE_RATIO = 0.8
+
+
+class ExtractionCache:
+    """
+    Кеш результатів вилучення тексту між запусками (SQLite у папці runs).
+
+    Кеш лише прискорює обробку: якщо базу не вдалося відкрити (заблокована,
+    пошкоджена), запуск іде без кешу.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_rows: int = MAX_ROWS,
+        max_text_chars: int = MAX_TEXT_CHARS,
+    ):
+        """
+        Відкрити (або створити) кеш.
+
+        Args:
+            path: Шлях до файлу бази (за замовчуванням runs/extract_cache.db)
+            max_rows: Максимальна кількість записів
+            max_text_chars: Максимальний сумарний обсяг збереженого тексту (символів)
+        """
+        self.path = path if path is not None else get_runs_dir() / CACHE_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        # Ключі знайдених записів - час використання оновлюється одним запитом при закритті
+        self._touched: List[str] = []
+        self._conn: sqlite3.Connection | None = None
+        try:
+            self._conn = sqlite3.connect(str(self.path))
+            self._open(max_rows, max_text_chars)
+        except sqlite3.Error:
+            # Без кешу: get завжди промах, put нічого не зберігає
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    def _open(self, max_rows: int, max_text_chars: int) -> None:
+        """Підготувати схему бази та обрізати кеш до меж."""
+        # Кеш не потребує гарантій довговічності - WAL без fsync на кожен запис
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # chars - довжина тексту, збережена при записі: межі рахуються без читання самих текстів
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extraction ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, source TEXT NOT NULL, quality REAL NOT NULL, "
+            "last_used REAL NOT NULL DEFAULT 0, chars INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Бази попередніх версій створені без last_used - такі записи вважаються найстарішими
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(extraction)")}
+        if "last_used" not in columns:
+            self._conn.execute("ALTER TABLE extraction ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        if "chars" not in columns:
+            # Одноразова міграція: довжини вже збережених текстів
+            self._conn.execute("ALTER TABLE extraction ADD COLUMN chars INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE extraction SET chars = LENGTH(text)")
+        self._conn.commit()
+        self._prune(max_rows, max_text_chars)
+
+    def _prune(self, max_rows: int, max_text_chars: int) -> None:
+        """Видалити найдавніше використані записи, якщо кеш перевищив межі."""
+        count, total_chars = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(chars), 0) FROM extraction"
+        ).fetchone()
+        if count <= max_rows and total_chars <= max_text_chars:
+            return
+        keep_rows = int(max_rows * PRUNE_RATIO)
+        keep_chars = int(max_text_chars * PRUNE_RATIO)
+        # Звільнені сторінки SQLite використовує для нових записів, тож файл далі не росте
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM extraction WHERE key IN ("
+                "SELECT key FROM ("
+                "SELECT key, ROW_NUMBER() OVER w AS position, SUM(chars) OVER w AS running "
+                "FROM extraction WINDOW w AS (ORDER BY last_used DESC ROWS UNBOUNDED PRECEDING)"
+                ") WHERE position > ? OR running > ?)",
+                (keep_rows, keep_chars),
+            )
+
+    @staticmethod
+    def make_key(sha256: str, ocr_lang: str) -> str:
+        return f"{sha256}:{ocr_lang}:v{EXTRACTOR_VERSION}"
+
+    def get(self, meta: FileMeta, ocr_lang: str) -> Optional[ExtractionResult]:
+        """Повернути збережений результат або None (файли без хешу не кешуються)."""
+        if not meta.sha256 or self._conn is None:
+            return None
+        key = self.make_key(meta.sha256, ocr_lang)
+        try:
+            row = self._conn.execute(
+                "SELECT text, source, quality FROM extraction WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.append(key)
+        return ExtractionResult(text=row[0], source=row[1], quality=row[2])
+
+    def put(self, meta: FileMeta, ocr_lang: str, result: ExtractionResult) -> None:
+        """Зберегти результат. Порожні результати не кешуються - вони дешеві і можуть застаріти."""
+        if not meta.sha256 or not result.text or self._conn is None:
+            return
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO extraction (key, text, source, quality, last_used, chars) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        self.make_key(meta.sha256, ocr_lang),
+                        result.text,
+                        result.source,
+                        result.quality,
+                        time.time(),
+                        len(result.text),
+                    ),
+                )
+        except sqlite3.Error:
+            pass  # Запис у кеш необов'язковий - результат уже є в пам'яті
+
+    def close(self) -> None:
+        """Записати час використання знайдених записів і закрити базу (повторний виклик - без дії)."""
+        if self._conn is None:
+            return
+        try:
+            if self._touched:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE extraction SET last_used = ? WHERE key = ?",
+                        ((now, key) for key in self._touched),
+                    )
+        except sqlite3.Error:
+            pass  # Записи лише здаватимуться давнішими при наступному обрізанні
+        finally:
+            self._touched.clear()
+            self._conn.close()
+            self._conn = None
+
+
+__all__ = ["ExtractionCache", "EXTRACTOR_VERSION"]
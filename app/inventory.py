@@ -4,15 +4,25 @@ from __future__ import annotations
 import re
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Set
-
-import pandas as pd
+from typing import Dict, Iterable, List, Sequence, Set, TYPE_CHECKING
 
 from app.config import get_runs_dir
 
+try:
+    import xlsxwriter  # noqa: F401 - лише перевірка наявності рушія для pandas
+except ImportError:  # pragma: no cover - fallback when dependency missing
+    xlsxwriter = None
 
-@dataclass
+# pandas імпортується лише у функціях, що працюють з таблицями: імпорт займає помітний
+# час, а InventoryRow потрібен модулям, які таблиць не торкаються (меню, конвеєр)
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# slots: рядок на кожен файл запуску - без окремого __dict__ на кожен екземпляр
+@dataclass(slots=True)
 class InventoryRow:
     root: str
     folder_old: str
@@ -83,6 +93,9 @@ class RunSummary:
     excel_updated: bool
 
 
+# Колонкова копія аркуша inventory для швидкого читання меню
+PARQUET_FILENAME = "inventory.parquet"
+
 # Заборонені символи в назвах аркушів Excel: : \ / ? * [ ]
 INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
 MAX_SHEET_NAME_LENGTH = 31
@@ -184,9 +197,12 @@ def normalize_sheet_name(name: str, used_names: Set[str] | None = None, fallback
 
 
 def _dataframe(rows: Iterable[InventoryRow]) -> pd.DataFrame:
-    df = pd.DataFrame([asdict(row) for row in rows])
-    if df.empty:
-        df = pd.DataFrame(columns=InventoryRow.__annotations__.keys())
+    import pandas as pd
+
+    columns = list(InventoryRow.__annotations__)
+    # Кортежі значень замість asdict(): без глибокої копії та проміжного словника на кожен рядок
+    values = attrgetter(*columns)
+    df = pd.DataFrame([values(row) for row in rows], columns=columns)
 
     # Санітизація всіх текстових колонок для Excel
     for col in df.columns:
@@ -197,6 +213,8 @@ def _dataframe(rows: Iterable[InventoryRow]) -> pd.DataFrame:
 
 
 def write_inventory(rows: Iterable[InventoryRow], summary: RunSummary, run_dir: Path) -> None:
+    import pandas as pd
+
     run_dir.mkdir(parents=True, exist_ok=True)
     df = _dataframe(rows)
     views = {
@@ -218,8 +236,22 @@ def write_inventory(rows: Iterable[InventoryRow], summary: RunSummary, run_dir:
     # Трекінг використаних назв аркушів для уникнення конфліктів
     used_names: Set[str] = set()
 
-    # Створюємо тільки .xlsx файл (сучасний формат) з openpyxl
-    with pd.ExcelWriter(xlsx_path, engine="openpyxl") as writer:
+    # Створюємо тільки .xlsx файл (сучасний формат). XlsxWriter пише XML потоком без
+    # дерева клітинок openpyxl; автоперетворення рядків вимкнено, щоб назви на кшталт
+    # "=..." чи "http://..." лишались текстом, як і з openpyxl.
+    # constant_memory не вмикається: pandas передає клітинки по колонках, а цей режим
+    # приймає лише рядок за рядком і мовчки відкидає решту.
+    if xlsxwriter is not None:
+        engine = "xlsxwriter"
+        engine_kwargs = {"options": {
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+            "strings_to_numbers": False,
+        }}
+    else:
+        engine = "openpyxl"
+        engine_kwargs = {}
+    with pd.ExcelWriter(xlsx_path, engine=engine, engine_kwargs=engine_kwargs) as writer:
         # Основний аркуш
         main_sheet = normalize_sheet_name("inventory", used_names, fallback="Inventory")
         df.to_excel(writer, sheet_name=main_sheet, index=False)
@@ -233,14 +265,52 @@ def write_inventory(rows: Iterable[InventoryRow], summary: RunSummary, run_dir:
         summary_sheet = normalize_sheet_name("run_summary", used_names, fallback="Summary")
         summary_df.to_excel(writer, sheet_name=summary_sheet, index=False)
 
+    _write_parquet_copy(df, run_dir)
+
+
+def _write_parquet_copy(df: pd.DataFrame, run_dir: Path) -> None:
+    """
+    Зберегти машинну копію аркуша inventory у Parquet (якщо встановлено pyarrow).
+
+    Excel лишається основним файлом для людини; копія лише прискорює read_inventory.
+    Стара копія видаляється до запису, щоб читач ніколи не взяв застарілі дані.
+    """
+    parquet_path = run_dir / PARQUET_FILENAME
+    parquet_path.unlink(missing_ok=True)
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+    except (ImportError, TypeError, ValueError):
+        # Немає pyarrow або колонку не вдалося перетворити - читатиметься Excel
+        parquet_path.unlink(missing_ok=True)
+
+
+def read_inventory(run_dir: Path, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """
+    Прочитати інвентаризацію запуску.
+
+    Args:
+        run_dir: Директорія запуску
+        columns: Потрібні колонки (None - усі)
+
+    Returns:
+        DataFrame аркуша inventory (з Parquet-копії, якщо вона є і не старша
+        за Excel - inventory.xlsx міг бути змінений після неї, інакше з Excel)
+    """
+    import pandas as pd
 
-def read_inventory(run_dir: Path) -> pd.DataFrame:
-    """Прочитати інвентаризацію з Excel файлу."""
     xlsx_path = run_dir / "inventory.xlsx"
     if not xlsx_path.exists():
         raise FileNotFoundError(f"Інвентаризація не знайдена: {xlsx_path}")
 
-    df = pd.read_excel(xlsx_path, sheet_name="inventory")
+    columns = list(columns) if columns is not None else None
+    parquet_path = run_dir / PARQUET_FILENAME
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= xlsx_path.stat().st_mtime:
+        try:
+            return pd.read_parquet(parquet_path, engine="pyarrow", columns=columns)
+        except ImportError:
+            pass
+
+    df = pd.read_excel(xlsx_path, sheet_name="inventory", usecols=columns)
     return df
 
 
@@ -270,21 +340,22 @@ def update_inventory_after_sort(
         file_updates: Мапа старих шляхів на нові
         sort_strategy: Стратегія сортування
     """
+    import pandas as pd
+
     df = read_inventory(run_dir)
 
-    # Оновити записи про файли
-    for old_path, new_path in file_updates.items():
-        mask = df["path_final"] == old_path
-        if mask.any():
-            df.loc[mask, "path_final"] = new_path
-            df.loc[mask, "sorted"] = True
-            df.loc[mask, "sort_strategy"] = sort_strategy
-            df.loc[mask, "sorted_subfolder"] = str(Path(new_path).parent)
+    # Оновити записи про файли - один прохід по колонці замість маски на кожен файл
+    new_paths = df["path_final"].map(file_updates)
+    mask = new_paths.notna()
+    if mask.any():
+        moved = new_paths[mask]
+        df.loc[mask, "path_final"] = moved
+        df.loc[mask, "sorted"] = True
+        df.loc[mask, "sort_strategy"] = sort_strategy
+        df.loc[mask, "sorted_subfolder"] = moved.map(lambda p: str(Path(p).parent))
 
     # Перезаписати Excel з оновленими даними
-    rows = []
-    for _, row_dict in df.iterrows():
-        rows.append(InventoryRow(**row_dict))
+    rows = [InventoryRow(**row_dict) for row_dict in df.to_dict("records")]
 
     # Читаємо summary
     summary_df = pd.read_excel(run_dir / "inventory.xlsx", sheet_name="run_summary")
@@ -0,0 +1,41 @@
+"""Fast JSON helpers for per-file logs and checkpoints (orjson when available)."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback when dependency missing
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Серіалізувати в компактний JSON без екранування не-ASCII символів."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Серіалізувати в компактний JSON одразу в UTF-8 байти (для частих записів у файл)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_indented(obj: Any) -> bytes:
+    """Серіалізувати з відступом 2 пробіли одразу в UTF-8 байти (для запису у файл)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """Розібрати JSON (помилки - json.JSONDecodeError в обох реалізаціях)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+__all__ = ["dumps", "dumps_bytes", "dumps_indented", "loads"]
@@ -0,0 +1,152 @@
+"""Persistent cache of LLM document analysis keyed by the text sent to the model."""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.config import get_runs_dir
+
+# Збільшити при зміні промпту аналізу, щоб інвалідувати старі відповіді
+PROMPT_VERSION = 1
+CACHE_FILENAME = "llm_cache.db"
+# Межа розміру кешу: при перевищенні під час відкриття видаляються найдавніше використані
+# відповіді, доки не лишиться PRUNE_RATIO від межі. Відповіді короткі (опис до 200 символів),
+# тож досить обмежити кількість записів
+MAX_ROWS = 100_000
+PRUNE_RATIO = 0.8
+
+# (category, date, summary) - як повертає LLMClient.analyze_document
+Analysis = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class LLMCache:
+    """
+    Кеш відповідей LLM між запусками (SQLite у папці runs).
+
+    Як і кеш вилучення, лише прискорює: якщо базу не вдалося відкрити,
+    відповіді просто запитуються в моделі.
+    """
+
+    def __init__(self, path: Path | None = None, max_rows: int = MAX_ROWS):
+        """
+        Відкрити (або створити) кеш.
+
+        Args:
+            path: Шлях до файлу бази (за замовчуванням runs/llm_cache.db)
+            max_rows: Максимальна кількість збережених відповідей
+        """
+        self.path = path if path is not None else get_runs_dir() / CACHE_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        # Кеш використовують потоки класифікації - одне з'єднання під замком
+        self._lock = threading.Lock()
+        # Ключі знайдених відповідей - час використання оновлюється одним запитом при закритті
+        self._touched: List[str] = []
+        self._conn: sqlite3.Connection | None = None
+        try:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._open(max_rows)
+        except sqlite3.Error:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    def _open(self, max_rows: int) -> None:
+        """Підготувати схему бази та обрізати кеш до межі."""
+        # Кеш не потребує гарантій довговічності - WAL без fsync на кожен запис
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis ("
+            "key TEXT PRIMARY KEY, category TEXT, date TEXT, summary TEXT, "
+            "last_used REAL NOT NULL DEFAULT 0)"
+        )
+        # Бази попередніх версій створені без last_used - такі записи вважаються найстарішими
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(analysis)")}
+        if "last_used" not in columns:
+            self._conn.execute("ALTER TABLE analysis ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+        self._prune(max_rows)
+
+    def _prune(self, max_rows: int) -> None:
+        """Видалити найдавніше використані відповіді, якщо кеш перевищив межу."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM analysis").fetchone()
+        if count <= max_rows:
+            return
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM analysis WHERE key IN ("
+                "SELECT key FROM analysis ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (int(max_rows * PRUNE_RATIO),),
+            )
+
+    @staticmethod
+    def make_key(text: str, provider: str, model: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{digest}:{provider}:{model}:v{PROMPT_VERSION}"
+
+    def get(self, text: str, provider: str, model: str) -> Optional[Analysis]:
+        """Повернути збережену відповідь для тексту, надісланого моделі, або None."""
+        key = self.make_key(text, provider, model)
+        with self._lock:
+            row = None
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT category, date, summary FROM analysis WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched.append(key)
+        return row[0], row[1], row[2]
+
+    def put(self, text: str, provider: str, model: str, analysis: Analysis) -> None:
+        """Зберегти відповідь. Порожні відповіді не кешуються - запит варто повторити."""
+        category, date, summary = analysis
+        if not (category or date):
+            return
+        key = self.make_key(text, provider, model)
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO analysis (key, category, date, summary, last_used) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, category, date, summary, time.time()),
+                    )
+            except sqlite3.Error:
+                pass  # Відповідь уже отримано - кеш необов'язковий
+
+    def close(self) -> None:
+        """Записати час використання знайдених відповідей і закрити базу (повторний виклик - без дії)."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                if self._touched:
+                    now = time.time()
+                    with self._conn:
+                        self._conn.executemany(
+                            "UPDATE analysis SET last_used = ? WHERE key = ?",
+                            ((now, key) for key in self._touched),
+                        )
+            except sqlite3.Error:
+                pass  # Відповіді лише здаватимуться давнішими при наступному обрізанні
+            finally:
+                self._touched.clear()
+                self._conn.close()
+                self._conn = None
+
+
+__all__ = ["LLMCache", "PROMPT_VERSION", "CACHE_FILENAME"]
@@ -2,11 +2,17 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 import requests
 from rich.console import Console
 
+from . import jsonx
+
+if TYPE_CHECKING:
+    from .llm_cache import LLMCache
+
 console = Console()
 
 
@@ -16,6 +22,8 @@ class LLMClient:
     # Ліміти для запитів/відповідей
     MAX_INPUT_LENGTH = 1000  # Максимум символів на вхід
     MAX_OUTPUT_DISPLAY = 500  # Максимум символів для відображення в TUI
+    MAX_RESPONSE_TOKENS = 500  # Ліміт токенів відповіді на один документ
+    MAX_BATCH_RESPONSE_TOKENS = 4000  # Ліміт токенів відповіді на пакетний запит (ліміти моделей)
 
     def __init__(
         self,
@@ -24,17 +32,26 @@ class LLMClient:
         model: str,
         enabled: bool = False,
         session_dir: Optional[Path] = None,
+        cache: Optional["LLMCache"] = None,
     ):
         self.provider = provider
         self.api_key = api_key
         self.model = model
         self.enabled = enabled
         self.session_dir = session_dir
+        # Кеш відповідей між запусками (повторний аналіз того самого тексту без запиту)
+        self.cache = cache
         self.request_count = 0
         self.response_count = 0
         self.total_tokens = 0
         self.tokens_sent = 0
         self.tokens_received = 0
+        # Клієнт викликається з кількох потоків класифікації - лічильники оновлюються під замком
+        self._lock = threading.Lock()
+        # Одна HTTP-сесія на потік: з'єднання (TCP + TLS) перевикористовуються між запитами,
+        # а requests.Session не гарантує потокобезпечності при спільному використанні
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
 
         # Лог всіх запитів/відповідей для сесії
         self.request_log: List[Dict] = []
@@ -55,9 +72,100 @@ class LLMClient:
         if not self.enabled or not self.api_key:
             return None, None, None
 
+        text_sample = self._sample(text)
+        if self.cache is not None:
+            cached = self.cache.get(text_sample, self.provider, self.model)
+            if cached is not None:
+                return cached
+        return self._analyze_sample(text_sample, filename)
+
+    def analyze_documents(
+        self, texts: List[str]
+    ) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        """
+        Аналізувати кілька документів одним запитом до LLM.
+
+        Відповіді з кешу не надсилаються повторно. Документи надсилаються пакетами не більше
+        MAX_BATCH_RESPONSE_TOKENS // MAX_RESPONSE_TOKENS; якщо модель повернула не масив
+        потрібної довжини, документи пакета аналізуються по одному.
+
+        Args:
+            texts: Тексти документів
+
+        Returns:
+            (category, date, summary) для кожного тексту в тому ж порядку
+        """
+        if not self.enabled or not self.api_key:
+            return [(None, None, None)] * len(texts)
+
+        samples = [self._sample(text) for text in texts]
+        results: List[Optional[Tuple[Optional[str], Optional[str], Optional[str]]]] = [None] * len(samples)
+        if self.cache is not None:
+            for i, sample in enumerate(samples):
+                results[i] = self.cache.get(sample, self.provider, self.model)
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        max_batch = max(1, self.MAX_BATCH_RESPONSE_TOKENS // self.MAX_RESPONSE_TOKENS)
+        single: List[int] = []
+        for start in range(0, len(missing), max_batch):
+            chunk = missing[start:start + max_batch]
+            if len(chunk) > 1:
+                answers = self._request_batch([samples[i] for i in chunk])
+                if answers is not None:
+                    for i, answer in zip(chunk, answers):
+                        results[i] = self._accept_answer(samples[i], "", answer)
+                    continue
+            single.extend(chunk)
+
+        for i in single:
+            results[i] = self._analyze_sample(samples[i], "")
+        return results
+
+    def _sample(self, text: str) -> str:
         # Обрізаємо текст до встановленого ліміту (1000 символів)
-        text_sample = text[:self.MAX_INPUT_LENGTH] if len(text) > self.MAX_INPUT_LENGTH else text
+        return text[:self.MAX_INPUT_LENGTH] if len(text) > self.MAX_INPUT_LENGTH else text
+
+    @staticmethod
+    def _strip_code_fence(response_text: str) -> str:
+        """Видалити можливі markdown backticks навколо JSON."""
+        clean_response = response_text.strip()
+        if clean_response.startswith("```"):
+            clean_response = clean_response.split("```")[1]
+            if clean_response.startswith("json"):
+                clean_response = clean_response[4:]
+        return clean_response.strip()
+
+    def _accept_answer(
+        self, text_sample: str, filename: str, data: Dict
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Залогувати розібрану відповідь, покласти в кеш і повернути (category, date, summary)."""
+        category = data.get("category")
+        date = data.get("date")
+        summary_full = data.get("summary") or ""
+        if not isinstance(summary_full, str):
+            summary_full = str(summary_full)
+
+        # Обрізаємо summary до ліміту для відображення (500 символів)
+        summary_display = summary_full[:self.MAX_OUTPUT_DISPLAY] if len(summary_full) > self.MAX_OUTPUT_DISPLAY else summary_full
+
+        # Логуємо запит/відповідь
+        self._log_request(
+            filename=filename,
+            input_text=text_sample,
+            category=category,
+            date=date,
+            summary_full=summary_full,
+            summary_display=summary_display,
+        )
 
+        if self.cache is not None:
+            self.cache.put(text_sample, self.provider, self.model, (category, date, summary_display))
+        return category, date, summary_display
+
+    def _analyze_sample(
+        self, text_sample: str, filename: str
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Надіслати один (уже обрізаний) текст моделі."""
         prompt = f"""Проаналізуй цей документ і дай відповідь у форматі JSON:
 
 Текст документа:
@@ -74,38 +182,14 @@ class LLMClient:
             response_text = self._make_request(prompt)
 
             if response_text:
-                self.response_count += 1
+                with self._lock:
+                    self.response_count += 1
 
                 # Парсимо JSON
                 try:
-                    # Видаляємо можливі markdown backticks
-                    clean_response = response_text.strip()
-                    if clean_response.startswith("```"):
-                        clean_response = clean_response.split("```")[1]
-                        if clean_response.startswith("json"):
-                            clean_response = clean_response[4:]
-                    clean_response = clean_response.strip()
-
-                    data = json.loads(clean_response)
-                    category = data.get("category")
-                    date = data.get("date")
-                    summary_full = data.get("summary", "")
-
-                    # Обрізаємо summary до ліміту для відображення (500 символів)
-                    summary_display = summary_full[:self.MAX_OUTPUT_DISPLAY] if len(summary_full) > self.MAX_OUTPUT_DISPLAY else summary_full
-
-                    # Логуємо запит/відповідь
-                    self._log_request(
-                        filename=filename,
-                        input_text=text_sample,
-                        category=category,
-                        date=date,
-                        summary_full=summary_full,
-                        summary_display=summary_display,
-                    )
-
-                    return category, date, summary_display
-                except json.JSONDecodeError as e:
+                    data = jsonx.loads(self._strip_code_fence(response_text))
+                    return self._accept_answer(text_sample, filename, data)
+                except json.JSONDecodeError as e:  # orjson.JSONDecodeError - підклас
                     # Тільки при помилці виводимо в консоль
                     console.print(
                         f"[yellow]⚠ Помилка парсингу JSON від LLM: {e}[/yellow]"
@@ -129,22 +213,78 @@ class LLMClient:
             )
             return None, None, None
 
-    def _make_request(self, prompt: str) -> Optional[str]:
+    def _request_batch(self, samples: List[str]) -> Optional[List[Dict]]:
+        """
+        Надіслати кілька текстів одним запитом.
+
+        Returns:
+            Список відповідей-словників у порядку текстів або None, якщо відповідь не підходить
+        """
+        documents = "\n\n".join(
+            f"--- Документ {number} ---\n{sample}" for number, sample in enumerate(samples, 1)
+        )
+        prompt = f"""Проаналізуй кожен із {len(samples)} документів нижче і дай відповідь у форматі JSON-масиву з {len(samples)} об'єктів у тому ж порядку, що й документи:
+
+{documents}
+
+Кожен об'єкт має містити:
+1. "category" - тип документа (договір, рахунок, акт, протокол, лист, наказ, звіт, кошторис, тендер, презентація, довідка, ТЗ, специфікація, або інше)
+2. "date" - дата документа у форматі YYYY-MM-DD (якщо є)
+3. "summary" - короткий опис документа (2-3 речення, максимум 200 символів)
+
+Відповідай тільки валідним JSON-масивом без додаткового тексту."""
+
+        response_text = self._make_request(prompt, max_tokens=self.MAX_RESPONSE_TOKENS * len(samples))
+        if not response_text:
+            return None
+        with self._lock:
+            self.response_count += 1
+        try:
+            data = jsonx.loads(self._strip_code_fence(response_text))
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, list) or len(data) != len(samples):
+            return None
+        if not all(isinstance(item, dict) for item in data):
+            return None
+        return data
+
+    def _session(self) -> requests.Session:
+        """HTTP-сесія поточного потоку (створюється при першому запиті)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Закрити HTTP-сесії та кеш відповідей."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _make_request(self, prompt: str, max_tokens: int = MAX_RESPONSE_TOKENS) -> Optional[str]:
         """Виконати запит до LLM API."""
-        self.request_count += 1
+        with self._lock:
+            self.request_count += 1
 
         try:
             if self.provider == "claude":
-                return self._request_claude(prompt)
+                return self._request_claude(prompt, max_tokens)
             elif self.provider == "chatgpt":
-                return self._request_openai(prompt)
+                return self._request_openai(prompt, max_tokens)
             else:
                 return None
         except Exception as e:
             console.print(f"[red]Помилка запиту до {self.provider}: {e}[/red]")
             return None
 
-    def _request_claude(self, prompt: str) -> Optional[str]:
+    def _request_claude(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Запит до Claude API."""
         headers = {
             "x-api-key": self.api_key,
@@ -154,11 +294,11 @@ class LLMClient:
 
         data = {
             "model": self.model or "claude-3-haiku-20240307",
-            "max_tokens": 500,
+            "max_tokens": max_tokens,
             "messages": [{"role": "user", "content": prompt}],
         }
 
-        response = requests.post(
+        response = self._session().post(
             "https://api.anthropic.com/v1/messages",
             headers=headers,
             json=data,
@@ -166,14 +306,16 @@ class LLMClient:
         )
 
         if response.status_code == 200:
-            result = response.json()
+            # Розбір одразу з байтів відповіді (orjson, якщо встановлено)
+            result = jsonx.loads(response.content)
             # Оновлюємо статистику
             if "usage" in result:
                 input_tokens = result["usage"].get("input_tokens", 0)
                 output_tokens = result["usage"].get("output_tokens", 0)
-                self.tokens_sent += input_tokens
-                self.tokens_received += output_tokens
-                self.total_tokens += input_tokens + output_tokens
+                with self._lock:
+                    self.tokens_sent += input_tokens
+                    self.tokens_received += output_tokens
+                    self.total_tokens += input_tokens + output_tokens
 
             content = result.get("content", [])
             if content and len(content) > 0:
@@ -185,7 +327,7 @@ class LLMClient:
 
         return None
 
-    def _request_openai(self, prompt: str) -> Optional[str]:
+    def _request_openai(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Запит до OpenAI API."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -195,11 +337,11 @@ class LLMClient:
         data = {
             "model": self.model or "gpt-3.5-turbo",
             "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 500,
+            "max_tokens": max_tokens,
             "temperature": 0.3,
         }
 
-        response = requests.post(
+        response = self._session().post(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=data,
@@ -207,14 +349,16 @@ class LLMClient:
         )
 
         if response.status_code == 200:
-            result = response.json()
+            # Розбір одразу з байтів відповіді (orjson, якщо встановлено)
+            result = jsonx.loads(response.content)
             # Оновлюємо статистику
             if "usage" in result:
                 prompt_tokens = result["usage"].get("prompt_tokens", 0)
                 completion_tokens = result["usage"].get("completion_tokens", 0)
-                self.tokens_sent += prompt_tokens
-                self.tokens_received += completion_tokens
-                self.total_tokens += result["usage"].get("total_tokens", 0)
+                with self._lock:
+                    self.tokens_sent += prompt_tokens
+                    self.tokens_received += completion_tokens
+                    self.total_tokens += result["usage"].get("total_tokens", 0)
 
             choices = result.get("choices", [])
             if choices and len(choices) > 0:
@@ -276,7 +420,8 @@ class LLMClient:
             "request_number": self.request_count,
         }
 
-        self.request_log.append(log_entry)
+        with self._lock:
+            self.request_log.append(log_entry)
 
     def save_log_to_file(self, session_dir: Path) -> Optional[Path]:
         """
@@ -305,10 +450,7 @@ class LLMClient:
                 "requests": self.request_log,
             }
 
-            log_path.write_text(
-                json.dumps(log_data, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            log_path.write_bytes(jsonx.dumps_indented(log_data))
 
             return log_path
         except Exception as e:
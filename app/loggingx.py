@@ -1,13 +1,14 @@
 """Logging helpers for human-readable and structured logs."""
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from loguru import logger
 
+from . import jsonx
+
 READABLE_LOG = "log_readable.txt"
 JSON_LOG = "log_events.jsonl"
 
@@ -43,7 +44,7 @@ def log_event(run_id: str, category: str, payload: Dict[str, Any]) -> None:
         "category": category,
     }
     entry.update(payload)
-    logger.log("INFO", json.dumps(entry, ensure_ascii=False))
+    logger.log("INFO", jsonx.dumps(entry))
 
 
 def log_readable(message: str) -> None:
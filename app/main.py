@@ -1,48 +1,170 @@
 """Entry point for the modular File Inventory Tool."""
 from __future__ import annotations
 
-import json
-import mimetypes
+import multiprocessing
+import os
 import sys
 import time
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
 
-from app import deps
+from app import deps, jsonx
 
-deps.ensure_ready()
+# Лише при запуску як програми: процеси пулу вилучення імпортують цей модуль
+# під іменем __mp_main__ і не повинні створювати venv чи доінстальовувати пакети
+if __name__ == "__main__":
+    deps.ensure_ready()
 
-from colorama import Fore, Style, init as colorama_init
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
+from rich.text import Text
 
-from app.classify import classify_text, summarize_text
+from app.checkpoint import ContextCheckpoint, find_resumable_run, load_checkpoint, load_run_info, mark_resumed, write_run_info
+from app.classify import classify_text, classify_texts, summarize_text
 from app.config import Config, load_config, save_config, test_llm_connection, get_runs_dir, get_output_dir
 from app.dedup import DuplicateGroup, detect_exact_duplicates
-from app.extract import ExtractionResult, extract_text
 from app.inventory import InventoryRow, RunSummary, write_inventory, find_latest_run, read_inventory, update_inventory_after_sort
-from app.llm_client import LLMClient
 from app.loggingx import log_event, log_readable, setup_logging
 from app.progress import ProgressTracker
-from app.rename import plan_renames
-from app.scan import FileMeta, ensure_hash, scan_directory, scan_directory_progressive
+from app.rename import RENAME_BATCH_SIZE, apply_renames, plan_renames
+from app.scan import FileMeta, HashPool, ensure_hash, filter_existing_files, scan_directory, scan_directory_progressive
 from app.sortout import delete_duplicates, quarantine_files, sort_files, flatten_directory
 from app.theme import THEME, markup, format_number, format_status, format_error, header_line
 
-colorama_init()
+if TYPE_CHECKING:
+    from app.extract import ExtractionResult
+    from app.llm_cache import LLMCache
+    from app.llm_client import LLMClient
+
 console = Console()
 
 
 @dataclass
 class FileContext:
+    """Компактний підсумок обробки файлу. Сам вилучений текст не зберігається - лише його метрики."""
     meta: FileMeta
-    text: ExtractionResult
     classification: Dict[str, Optional[str]]
     summary: str
     category: str
     date_doc: str
+    text_source: str
+    text_len: int
+    extract_quality: float
+
+
+def _context_to_record(ctx: FileContext) -> Dict[str, object]:
+    """Запис для журналу відновлення (contexts.jsonl)."""
+    return {
+        "path": str(ctx.meta.path),
+        "sha256": ctx.meta.sha256,
+        "classification": ctx.classification,
+        "summary": ctx.summary,
+        "category": ctx.category,
+        "date_doc": ctx.date_doc,
+        "text_source": ctx.text_source,
+        "text_len": ctx.text_len,
+        "extract_quality": ctx.extract_quality,
+    }
+
+
+def _context_from_record(meta: FileMeta, record: Dict[str, object]) -> FileContext:
+    """Відновити FileContext із запису журналу."""
+    return FileContext(
+        meta=meta,
+        classification=record["classification"],
+        summary=record["summary"],
+        category=record["category"],
+        date_doc=record["date_doc"],
+        text_source=record["text_source"],
+        text_len=record["text_len"],
+        extract_quality=record["extract_quality"],
+    )
+
+
+def _open_llm_cache(cfg: Config) -> LLMCache:
+    """Відкрити кеш відповідей LLM у cfg.llm_cache_dir або у папці runs за замовчуванням."""
+    from app.llm_cache import CACHE_FILENAME, LLMCache
+
+    path = Path(cfg.llm_cache_dir) / CACHE_FILENAME if cfg.llm_cache_dir else None
+    return LLMCache(path)
+
+
+def _mtime_date(meta: FileMeta) -> str:
+    """Дата зміни файлу (ISO) - запасна дата документа; date.fromtimestamp без проміжного datetime."""
+    return date.fromtimestamp(meta.mtime).isoformat()
+
+
+def _classify_document(
+    text: str,
+    meta: FileMeta,
+    llm_client: Optional[LLMClient],
+) -> Tuple[Dict[str, Optional[str]], str, str, str]:
+    """Класифікація та опис документа: (classification, category, date_doc, summary)."""
+    if not text or text.isspace():
+        # Порожній текст: LLM не викликається, а евристики нічого не знайдуть - той самий результат одразу
+        date_doc = _mtime_date(meta)
+        return {"category": "інше", "date_doc": None, "summary": None}, "інше", date_doc, ""
+    classification = classify_text(text, llm_client=llm_client)
+    return _finish_classification(classification, text, meta, llm_client)
+
+
+def _classify_documents(
+    texts: List[str],
+    metas: List[FileMeta],
+    llm_client: Optional[LLMClient],
+) -> List[Tuple[Dict[str, Optional[str]], str, str, str]]:
+    """Як _classify_document для кількох непорожніх текстів - одним запитом до LLM."""
+    classifications = classify_texts(texts, llm_client=llm_client)
+    return [
+        _finish_classification(classification, text, meta, llm_client)
+        for classification, text, meta in zip(classifications, texts, metas)
+    ]
+
+
+def _finish_classification(
+    classification: Dict[str, Optional[str]],
+    text: str,
+    meta: FileMeta,
+    llm_client: Optional[LLMClient],
+) -> Tuple[Dict[str, Optional[str]], str, str, str]:
+    category = classification.get("category") or "інше"
+    date_doc = classification.get("date_doc") or _mtime_date(meta)
+    # Якщо LLM повернув summary, використовуємо його
+    summary = classification.get("summary") or summarize_text(text, llm_client=llm_client)
+    return classification, category, date_doc, summary
+
+
+def _classify_batch_into(
+    futures: List[Future],
+    texts: List[str],
+    metas: List[FileMeta],
+    llm_client: Optional[LLMClient],
+) -> None:
+    """Класифікувати пакет і передати результат кожного файлу в його Future."""
+    try:
+        results = _classify_documents(texts, metas, llm_client)
+    except Exception as exc:
+        for future in futures:
+            future.set_exception(exc)
+        return
+    for future, result in zip(futures, results):
+        future.set_result(result)
+
+
+def _split_date(date_doc: str) -> Tuple[str, str, str]:
+    """Розбити дату YYYY-MM-DD на (рік, місяць, день) з типовими значеннями для відсутніх частин."""
+    # Позиційні зрізи, як і раніше: для не-ISO рядків рік - завжди перші 4 символи
+    length = len(date_doc)
+    yyyy = date_doc[:4] if length >= 4 else "2024"
+    mm = date_doc[5:7] if length >= 7 else "01"
+    dd = date_doc[8:10] if length >= 10 else "01"
+    return yyyy, mm, dd
 
 
 def show_rename_preview(rename_plans: list, max_preview: int = 50) -> bool:
@@ -70,29 +192,26 @@ def show_rename_preview(rename_plans: list, max_preview: int = 50) -> bool:
     total_files = len(rename_plans)
     preview_count = min(max_preview, total_files)
 
-    # Додати рядки до таблиці
-    for idx, plan in enumerate(rename_plans[:preview_count], 1):
-        old_name = plan.meta.path.name
-        new_name = plan.new_name
-        # Довжина без розширення
-        name_without_ext = Path(new_name).stem
-        length = len(name_without_ext)
-        collision_mark = markup(THEME.warning, "✓") if plan.collision else ""
-
-        # Підсвітка якщо довжина більше 20
-        if length > 20:
-            length_str = markup(THEME.error, str(length))
-        else:
-            length_str = markup(THEME.success, str(length))
+    # Спільні для всіх рядків комірки
+    arrow = "→"
+    collision_yes = markup(THEME.warning, "✓")
+    collision_no = ""
 
-        table.add_row(
+    # Довжина без розширення; підсвітка якщо більше 20 (готовий Text - без повторного розбору markup)
+    lengths = [len(os.path.splitext(plan.new_name)[0]) for plan in rename_plans[:preview_count]]
+    rows = [
+        (
             str(idx),
-            old_name,
-            "→",
-            new_name,
-            length_str,
-            collision_mark
+            plan.meta.path.name,
+            arrow,
+            plan.new_name,
+            Text(str(length), style=THEME.error if length > 20 else THEME.success),
+            collision_yes if plan.collision else collision_no,
         )
+        for idx, (plan, length) in enumerate(zip(rename_plans, lengths), 1)
+    ]
+    for row in rows:
+        table.add_row(*row)
 
     console.print(table)
 
@@ -104,12 +223,18 @@ def show_rename_preview(rename_plans: list, max_preview: int = 50) -> bool:
     console.print(f"\n{markup(THEME.title, 'Підсумок:')}")
     console.print(f"  • Всього файлів для перейменування: {format_number(total_files)}")
 
-    collisions = sum(1 for p in rename_plans if p.collision)
+    # Колізії та перевірка довжин - за один прохід
+    collisions = 0
+    too_long = 0
+    for p in rename_plans:
+        if p.collision:
+            collisions += 1
+        if len(os.path.splitext(p.new_name)[0]) > 20:
+            too_long += 1
+
     if collisions > 0:
         console.print(f"  • Файлів з колізіями (додано суфікс): {format_number(collisions, THEME.warning)}")
 
-    # Перевірка довжин
-    too_long = sum(1 for p in rename_plans if len(Path(p.new_name).stem) > 20)
     if too_long > 0:
         console.print(format_error(f"УВАГА: {too_long} файлів перевищують ліміт 20 символів!"))
 
@@ -121,7 +246,58 @@ def show_rename_preview(rename_plans: list, max_preview: int = 50) -> bool:
     return response in ('y', 'yes', 'так', 'т')
 
 
+def _commit_from_menu(cfg: Config) -> None:
+    """Запитати параметри застосування змін і запустити pipeline в режимі commit."""
+    confirm = input("Виконати перейменування? [Y/n] ").strip().lower()
+    if confirm not in {"", "y", "yes"}:
+        return
+    delete_choice = input("Видаляти точні дублікати замість карантину? [Y/n] ").strip().lower()
+    delete_exact = delete_choice in {"", "y", "yes"}
+    sort_choice = input("Сортувати файли по підпапках? [Y/n] ").strip().lower()
+    sort_strategy = None
+    if sort_choice in {"", "y", "yes"}:
+        console.print(markup(THEME.info, "1 = by_category, 2 = by_date, 3 = by_type"))
+        mapping = {"1": "by_category", "2": "by_date", "3": "by_type"}
+        selected = input("Оберіть стратегію: ").strip()
+        sort_strategy = mapping.get(selected)
+    execute_pipeline(cfg, mode="commit", delete_exact=delete_exact, sort_strategy=sort_strategy)
+
+
+# Пункти головного меню: (клавіша, назва, дія). Дія може повернути оновлений Config.
+MAIN_MENU: List[Tuple[str, str, Callable[[Config], Optional[Config]]]] = [
+    ("1", "Швидкий аналіз (dry-run)", lambda cfg: execute_pipeline(cfg, mode="dry-run")),
+    ("2", "Застосувати перейменування (commit)", _commit_from_menu),
+    ("3", "Переглянути підсумок останнього запуску", lambda cfg: show_last_summary()),
+    ("4", "Налаштування", lambda cfg: configure(cfg)),
+    ("5", "Відновити незавершений запуск", lambda cfg: resume_last_run(cfg)),
+    ("6", "Сортування та подання", lambda cfg: sort_and_organize(cfg)),
+    ("7", "Робота з дублікатами", lambda cfg: duplicates_menu(cfg)),
+    ("8", "Перевірити/переінсталювати залежності", lambda cfg: deps.ensure_ready()),
+]
+EXIT_KEY = "9"
+
+# Меню незмінне - розмітку формуємо один раз при імпорті
+_MENU_TEXT = "\n".join(
+    [f"\n{markup(THEME.title, 'File Inventory Tool')}"]
+    + [markup(THEME.primary_text, f"[{key}] {label}") for key, label, _ in MAIN_MENU]
+    + [markup(THEME.primary_text, f"[{EXIT_KEY}] Вихід")]
+)
+_PROMPT_SELECT = "Оберіть опцію: "
+
+# Підписи підсумку запуску
+_LBL_PROCESSED = markup(THEME.header, "Оброблено файлів:")
+_LBL_RENAMED = markup(THEME.header, "Перейменовано:")
+_LBL_DUPLICATES = markup(THEME.duplicate, "Дублікатів:")
+_LBL_CACHE_HITS = markup(THEME.header, "Взято з кешу вилучення:")
+_LBL_LLM_REQUESTS = markup(THEME.llm_request, "🤖 LLM запитів:")
+_LBL_LLM_TOKENS = markup(THEME.llm_request, "токенів:")
+
+
 def main() -> None:
+    # Кольори colorama потрібні лише інтерактивному меню (старі консолі Windows)
+    from colorama import init as colorama_init
+
+    colorama_init()
     try:
         cfg = load_config()
     except Exception as exc:
@@ -129,51 +305,22 @@ def main() -> None:
         console.print(markup(THEME.dim_text, "Використовуємо налаштування за замовчуванням."))
         cfg = Config()
 
+    actions = {key: action for key, _, action in MAIN_MENU}
+
     while True:
         try:
-            console.print(f"\n{markup(THEME.title, 'File Inventory Tool')}")
-            console.print(markup(THEME.primary_text, "[1] Швидкий аналіз (dry-run)"))
-            console.print(markup(THEME.primary_text, "[2] Застосувати перейменування (commit)"))
-            console.print(markup(THEME.primary_text, "[3] Переглянути підсумок останнього запуску"))
-            console.print(markup(THEME.primary_text, "[4] Налаштування"))
-            console.print(markup(THEME.primary_text, "[5] Відновити незавершений запуск"))
-            console.print(markup(THEME.primary_text, "[6] Сортування та подання"))
-            console.print(markup(THEME.primary_text, "[7] Робота з дублікатами"))
-            console.print(markup(THEME.primary_text, "[8] Перевірити/переінсталювати залежності"))
-            console.print(markup(THEME.primary_text, "[9] Вихід"))
-            choice = input("Оберіть опцію: ").strip()
-            if choice == "1":
-                execute_pipeline(cfg, mode="dry-run")
-            elif choice == "2":
-                confirm = input("Виконати перейменування? [Y/n] ").strip().lower()
-                if confirm in {"", "y", "yes"}:
-                    delete_choice = input("Видаляти точні дублікати замість карантину? [Y/n] ").strip().lower()
-                    delete_exact = delete_choice in {"", "y", "yes"}
-                    sort_choice = input("Сортувати файли по підпапках? [Y/n] ").strip().lower()
-                    sort_strategy = None
-                    if sort_choice in {"", "y", "yes"}:
-                        console.print(markup(THEME.info, "1 = by_category, 2 = by_date, 3 = by_type"))
-                        mapping = {"1": "by_category", "2": "by_date", "3": "by_type"}
-                        selected = input("Оберіть стратегію: ").strip()
-                        sort_strategy = mapping.get(selected)
-                    execute_pipeline(cfg, mode="commit", delete_exact=delete_exact, sort_strategy=sort_strategy)
-            elif choice == "3":
-                show_last_summary()
-            elif choice == "4":
-                cfg = configure(cfg)
-            elif choice == "5":
-                console.print(markup(THEME.warning, "Відновлення ще не реалізоване у цій версії."))
-            elif choice == "6":
-                sort_and_organize(cfg)
-            elif choice == "7":
-                duplicates_menu(cfg)
-            elif choice == "8":
-                deps.ensure_ready()
-            elif choice == "9":
+            console.print(_MENU_TEXT)
+            choice = input(_PROMPT_SELECT).strip()
+            if choice == EXIT_KEY:
                 console.print(markup(THEME.success, "До побачення!"))
                 break
-            else:
+            action = actions.get(choice)
+            if action is None:
                 console.print(markup(THEME.warning, "Невірний вибір. Спробуйте ще раз."))
+                continue
+            result = action(cfg)
+            if isinstance(result, Config):
+                cfg = result
         except KeyboardInterrupt:
             console.print(markup(THEME.warning, "\nПереривання... Зберігаю прогрес..."))
             break
@@ -294,6 +441,32 @@ def configure(cfg: Config) -> Config:
     return cfg
 
 
+def resume_last_run(cfg: Config) -> None:
+    """Продовжити перерваний запуск: вже оброблені файли беруться з його журналу."""
+    run_dir = find_resumable_run()
+    if run_dir is None:
+        console.print(markup(THEME.warning, "Немає незавершених запусків для відновлення."))
+        return
+    # Відновлення повторює режим перерваного запуску; запуски без run.json - як dry-run
+    info = load_run_info(run_dir)
+    mode = info.get("mode")
+    if mode not in {"dry-run", "commit"}:
+        console.print(markup(THEME.warning, "Режим перерваного запуску невідомий - відновлення виконується як dry-run."))
+        mode = "dry-run"
+    elif mode == "commit":
+        confirm = input("Перерваний запуск застосовував зміни. Продовжити в режимі commit? [Y/n] ").strip().lower()
+        if confirm not in {"", "y", "yes"}:
+            mode = "dry-run"
+    console.print(format_status(f"Відновлення запуску: {run_dir.name} (режим {mode})", is_error=False))
+    execute_pipeline(
+        cfg,
+        mode=mode,
+        delete_exact=bool(info.get("delete_exact")) if mode == "commit" else False,
+        sort_strategy=info.get("sort_strategy") if mode == "commit" else None,
+        resume_from=run_dir,
+    )
+
+
 def show_last_summary() -> None:
     runs_dir = get_runs_dir()
     if not runs_dir.exists():
@@ -309,6 +482,14 @@ def show_last_summary() -> None:
     console.print(f"{markup(THEME.header, 'Файл інвентаризації:')} {summary_path}")
 
 
+# Пункт меню сортування -> (стратегія, опис дії, опис результату)
+_SORT_CHOICES: Dict[str, Tuple[str, str, str]] = {
+    "1": ("by_category", "за категоріями", "за категоріями"),
+    "2": ("by_date", "за датами", "за датами"),
+    "3": ("by_type", "за типами файлів", "за типами"),
+}
+
+
 def sort_and_organize(cfg: Config) -> None:
     """Окреме меню для сортування та організації файлів."""
     console.print(header_line("Сортування та організація файлів"))
@@ -323,7 +504,7 @@ def sort_and_organize(cfg: Config) -> None:
 
     # Прочитати інвентаризацію
     try:
-        df = read_inventory(latest_run)
+        df = read_inventory(latest_run, columns=["path_final"])
         console.print(format_status(f"Завантажено {len(df)} записів", is_error=False))
     except Exception as e:
         console.print(format_error(f"Помилка читання інвентаризації: {e}"))
@@ -343,29 +524,14 @@ def sort_and_organize(cfg: Config) -> None:
     file_updates: Dict[str, str] = {}
 
     try:
-        if choice == "1":
-            # Сортування за категоріями
-            console.print(markup(THEME.processing, "\nСортування за категоріями..."))
-            files_to_sort = [Path(row["path_final"]) for _, row in df.iterrows() if Path(row["path_final"]).exists()]
-            mapping = sort_files(get_output_dir(), files_to_sort, "by_category", cfg.sorted_root)
+        # Список існуючих файлів спільний для всіх стратегій сортування - будуємо його один раз
+        if choice in _SORT_CHOICES:
+            strategy, action_label, result_label = _SORT_CHOICES[choice]
+            console.print(markup(THEME.processing, f"\nСортування {action_label}..."))
+            files_to_sort = filter_existing_files(df["path_final"].dropna().astype(str).tolist())
+            mapping = sort_files(get_output_dir(), files_to_sort, strategy, cfg.sorted_root)
             file_updates = {str(k): str(v) for k, v in mapping.items()}
-            console.print(format_status(f"Відсортовано {len(mapping)} файлів за категоріями", is_error=False))
-
-        elif choice == "2":
-            # Сортування за датами
-            console.print(markup(THEME.processing, "\nСортування за датами..."))
-            files_to_sort = [Path(row["path_final"]) for _, row in df.iterrows() if Path(row["path_final"]).exists()]
-            mapping = sort_files(get_output_dir(), files_to_sort, "by_date", cfg.sorted_root)
-            file_updates = {str(k): str(v) for k, v in mapping.items()}
-            console.print(format_status(f"Відсортовано {len(mapping)} файлів за датами", is_error=False))
-
-        elif choice == "3":
-            # Сортування за типами
-            console.print(markup(THEME.processing, "\nСортування за типами файлів..."))
-            files_to_sort = [Path(row["path_final"]) for _, row in df.iterrows() if Path(row["path_final"]).exists()]
-            mapping = sort_files(get_output_dir(), files_to_sort, "by_type", cfg.sorted_root)
-            file_updates = {str(k): str(v) for k, v in mapping.items()}
-            console.print(format_status(f"Відсортовано {len(mapping)} файлів за типами", is_error=False))
+            console.print(format_status(f"Відсортовано {len(mapping)} файлів {result_label}", is_error=False))
 
         elif choice == "4":
             # Об'єднання файлів
@@ -394,7 +560,7 @@ def sort_and_organize(cfg: Config) -> None:
         # Оновити інвентаризацію
         if file_updates:
             console.print(markup(THEME.processing, "\nОновлення інвентаризації..."))
-            strategy = {"1": "by_category", "2": "by_date", "3": "by_type", "4": "flattened"}.get(choice, "manual")
+            strategy = _SORT_CHOICES[choice][0] if choice in _SORT_CHOICES else "flattened"
             update_inventory_after_sort(latest_run, file_updates, strategy)
             console.print(format_status(f"Інвентаризація оновлена: {latest_run / 'inventory.xlsx'}", is_error=False))
 
@@ -418,7 +584,9 @@ def duplicates_menu(cfg: Config) -> None:
 
     # Прочитати інвентаризацію
     try:
-        df = read_inventory(latest_run)
+        df = read_inventory(
+            latest_run, columns=["path_final", "dup_type", "dup_group_id", "dup_rank", "size_mb"]
+        )
         console.print(format_status(f"Завантажено {len(df)} записів", is_error=False))
     except Exception as e:
         console.print(format_error(f"Помилка читання інвентаризації: {e}"))
@@ -452,11 +620,15 @@ def duplicates_menu(cfg: Config) -> None:
         # Показати список дублікатів
         console.print(f"\n{markup(THEME.header, '═══ СПИСОК ДУБЛІКАТІВ ═══')}\n")
 
+        # Весь список одним виводом замість print на кожен файл; шляхи екрануються,
+        # щоб дужки в назвах не сприймались як розмітка
+        lines: List[str] = []
         for group_id, group in dup_groups:
-            console.print(f"{markup(THEME.warning, f'Група {group_id}:')}")
-            for _, row in group.iterrows():
-                console.print(f"  • {row['path_final']} ({row['dup_rank']}) - {row['size_mb']:.2f} MB")
-            console.print()
+            lines.append(markup(THEME.warning, f"Група {group_id}:"))
+            for path_final, dup_rank, size_mb in zip(group['path_final'], group['dup_rank'], group['size_mb']):
+                lines.append(f"  • {escape(str(path_final))} ({dup_rank}) - {size_mb:.2f} MB")
+            lines.append("")
+        console.print("\n".join(lines))
 
     elif choice == "2":
         # Перемістити дублікати
@@ -466,9 +638,9 @@ def duplicates_menu(cfg: Config) -> None:
         from collections import defaultdict
         duplicates_map = defaultdict(list)
 
-        for _, row in duplicates.iterrows():
-            if row['dup_rank'] != 'V1':  # Не переміщуємо мастер-файл
-                duplicates_map[row['dup_group_id']].append(Path(row['path_final']))
+        copies = duplicates[duplicates['dup_rank'] != 'V1']  # Не переміщуємо мастер-файл
+        for group_id, path_final in zip(copies['dup_group_id'], copies['path_final']):
+            duplicates_map[group_id].append(Path(path_final))
 
         root = cfg.root_path
         mapping = quarantine_files(root, dict(duplicates_map))
@@ -488,10 +660,8 @@ def duplicates_menu(cfg: Config) -> None:
 
         if confirm in {"y", "yes", "так", "т"}:
             # Видалити тільки дублікати, не мастер-файли
-            files_to_delete = []
-            for _, row in duplicates.iterrows():
-                if row['dup_rank'] != 'V1':
-                    files_to_delete.append(Path(row['path_final']))
+            copies = duplicates[duplicates['dup_rank'] != 'V1']
+            files_to_delete = [Path(path_final) for path_final in copies['path_final']]
 
             delete_duplicates(files_to_delete)
             console.print(format_status(f"Видалено {len(files_to_delete)} файлів в кошик", is_error=False))
@@ -505,7 +675,186 @@ def duplicates_menu(cfg: Config) -> None:
         console.print(markup(THEME.warning, "Невірний вибір"))
 
 
-def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_strategy: Optional[str] = None) -> None:
+# Опис дубліката для файлів, що не входять у жодну групу (спільний для всіх рядків, тому лише для читання)
+_UNIQUE_DUP_INFO: Mapping[str, Optional[str]] = MappingProxyType({
+    "dup_type": "unique",
+    "dup_group_id": None,
+    "dup_rank": "V1",
+    "dup_master_path": None,
+})
+
+
+# Найпоширеніші типи документів - без звернення до mimetypes (і до реєстру Windows)
+_FAST_MIME: Dict[str, str] = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".xls": "application/vnd.ms-excel",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".odt": "application/vnd.oasis.opendocument.text",
+    ".rtf": "application/rtf",
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".csv": "text/csv",
+    ".html": "text/html",
+    ".xml": "application/xml",
+    ".json": "application/json",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+    ".zip": "application/zip",
+}
+
+# 1/2**20 точно представляється у float, тож множення дає той самий результат, що й ділення
+_BYTES_TO_MB = 1.0 / (1024 * 1024)
+
+# MIME-тип за розширенням: guess_type залежить лише від суфіксів, а їх у наборі небагато
+_MIME_CACHE: Dict[str, str] = {}
+
+
+def _guess_mime(name: str, suffix: str) -> str:
+    """MIME-тип файлу: статична таблиця, далі кеш за розширенням."""
+    # guess_type шукає звичайні розширення і в нижньому регістрі, тож ".PDF" береться з таблиці
+    mime = _FAST_MIME.get(suffix.lower()) or _MIME_CACHE.get(suffix)
+    if mime is None:
+        import mimetypes
+
+        mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        # Для .gz/.bz2 тощо тип визначає попередній суфікс (.tar.gz) - такі не кешуємо
+        if suffix.lower() not in mimetypes.encodings_map:
+            _MIME_CACHE[suffix] = mime
+    return mime
+
+
+def _build_row(
+    meta: FileMeta,
+    ctx: FileContext,
+    dup_info: Mapping[str, Optional[str]],
+    target: Path,
+    status: str,
+    error: str,
+    collision: bool,
+    ocr_lang: str,
+    llm_used: bool,
+    root_str: str,
+    sort_strategy: Optional[str],
+    mode: str,
+) -> InventoryRow:
+    """Рядок інвентаризації для одного файлу (target - шлях після перейменування або поточний)."""
+    path = meta.path
+    name = path.name
+    suffix = path.suffix
+    path_str = str(path)
+    # Батьківська папка як рядок - без створення проміжного Path через .parent
+    folder_str = os.path.dirname(path_str) or "."
+    if target is path:
+        target_str, target_folder_str, target_name = path_str, folder_str, name
+    else:
+        target_str = str(target)
+        target_folder_str = os.path.dirname(target_str) or "."
+        target_name = target.name
+    # datetime незмінний - якщо часи збігаються (типово для скопійованих файлів), ділимо один об'єкт
+    fromtimestamp = datetime.fromtimestamp
+    mtime = fromtimestamp(meta.mtime)
+    ctime = mtime if meta.ctime == meta.mtime else fromtimestamp(meta.ctime)
+    # Позиційні аргументи в порядку полів InventoryRow: виклик із 42 іменованими аргументами
+    # у кілька разів повільніший, а рядок будується для кожного файлу
+    return InventoryRow(
+        root_str,                      # root
+        folder_str,                    # folder_old
+        path_str,                      # path_old
+        name,                          # name_old
+        target_name,                   # name_new
+        target_folder_str,             # folder_new
+        target_str,                    # path_new
+        False,                         # sorted
+        sort_strategy or "",           # sort_strategy
+        "",                            # sorted_subfolder
+        target_str,                    # path_final
+        suffix.lower(),                # ext
+        _guess_mime(name, suffix),     # mime
+        meta.size * _BYTES_TO_MB,      # size_mb
+        ctime,                         # ctime
+        mtime,                         # mtime
+        ctx.date_doc,                  # date_doc
+        ctx.category,                  # category
+        ctx.summary,                   # short_title
+        "01",                          # version
+        (meta.sha256 or "0" * 8)[:8],  # hash8
+        meta.sha256 or "",             # content_hash_sha256
+        dup_info["dup_type"],          # dup_type
+        dup_info["dup_group_id"],      # dup_group_id
+        dup_info["dup_rank"],          # dup_rank
+        dup_info["dup_master_path"],   # dup_master_path
+        None,                          # near_dup_score
+        "present",                     # lifecycle_state
+        None,                          # deleted_ts
+        ctx.text_source,               # text_source
+        ocr_lang,                      # ocr_lang
+        ctx.text_len,                  # text_len
+        ctx.extract_quality,           # extract_quality
+        llm_used,                      # llm_used
+        None,                          # llm_confidence
+        "",                            # llm_keywords
+        ctx.summary,                   # summary_200
+        status,                        # rename_status
+        error,                         # error_message
+        collision,                     # collision
+        0.0,                           # duration_s
+        mode,                          # mode
+    )
+
+
+def _build_unrenamed_rows(
+    metas: List[FileMeta],
+    file_contexts: Dict[Path, FileContext],
+    duplicates_map: Dict[Path, Dict[str, Optional[str]]],
+    ocr_lang: str,
+    llm_used: bool,
+    root: Path,
+    sort_strategy: Optional[str],
+    mode: str,
+) -> Dict[Path, InventoryRow]:
+    """Рядки інвентаризації за шляхом для файлів, які не перейменовуються (дублікати)."""
+    root_str = str(root)
+    return {
+        meta.path: _build_row(
+            meta,
+            file_contexts[meta.path],
+            duplicates_map.get(meta.path, _UNIQUE_DUP_INFO),
+            meta.path,
+            "skipped",
+            "",
+            False,
+            ocr_lang,
+            llm_used,
+            root_str,
+            sort_strategy,
+            mode,
+        )
+        for meta in metas
+    }
+
+
+def execute_pipeline(
+    cfg: Config,
+    mode: str,
+    delete_exact: bool = False,
+    sort_strategy: Optional[str] = None,
+    resume_from: Optional[Path] = None,
+) -> None:
+    # Вилучення тексту (pdfminer, PIL, OCR) та HTTP-клієнт LLM імпортуються лише під час
+    # запуску обробки - меню відкривається без них
+    from app.extract import extract_text
+    from app.extract_cache import ExtractionCache
+    from app.llm_client import LLMClient
+
     start_time = datetime.now(timezone.utc)
     run_id = start_time.strftime("%Y%m%dT%H%M%S")
     run_dir = get_runs_dir() / run_id
@@ -513,6 +862,12 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
     try:
         setup_logging(run_dir)
         save_config(cfg, run_dir)
+        write_run_info(run_dir, {
+            "mode": mode,
+            "delete_exact": delete_exact,
+            "sort_strategy": sort_strategy,
+            "resumed_from": resume_from.name if resume_from is not None else None,
+        })
     except Exception as exc:
         console.print(format_error(f"Помилка ініціалізації: {exc}"))
         return
@@ -529,6 +884,15 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
         scan_dir=str(cfg.root_path),  # Передати папку сканування
     )
 
+    # Результати перерваного запуску (для відновлення) та журнал поточного
+    resume_records = load_checkpoint(resume_from) if resume_from else {}
+    checkpoint: Optional[ContextCheckpoint] = None
+    llm_pool: Optional[ThreadPoolExecutor] = None
+    extract_pool: Optional[ProcessPoolExecutor] = None
+    hasher: Optional[HashPool] = None
+    extract_cache: Optional[ExtractionCache] = None
+    llm_client: Optional[LLMClient] = None
+
     # Запустити візуальний прогрес-бар
     mode_text = "швидкого аналізу" if mode == "dry-run" else "застосування змін"
     console.print(f"\n{markup(THEME.success, f'Запуск {mode_text}...')}")
@@ -536,6 +900,8 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
 
     try:
         root = cfg.root_path
+        # Налаштування, які читаються для кожного файлу, - один раз у локальні змінні
+        ocr_lang = cfg.ocr_lang
 
         # Validate root path exists
         if not root.exists():
@@ -549,7 +915,6 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
             return
 
         # Створити LLM клієнт якщо увімкнено
-        llm_client = None
         if cfg.llm_enabled and cfg.llm_provider != "none":
             api_key = ""
             if cfg.llm_provider == "claude":
@@ -563,6 +928,7 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
                     api_key=api_key,
                     model=cfg.llm_model,
                     enabled=True,
+                    cache=_open_llm_cache(cfg) if cfg.llm_cache else None,
                 )
                 console.print(
                     format_status(f"LLM увімкнено: {cfg.llm_provider} ({cfg.llm_model or 'default'})", is_error=False)
@@ -574,6 +940,8 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
 
         # Прогресивне сканування з оновленням дисплею в реальному часі
         metas = []
+        # Хешування стартує ще під час обходу папок: читання вмісту перекривається зі скануванням
+        hasher = HashPool(cfg.threads or None)
         try:
             for idx, meta in enumerate(
                 scan_directory_progressive(
@@ -586,6 +954,8 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
                 1,
             ):
                 metas.append(meta)
+                if meta.should_process:
+                    hasher.submit(meta)
                 # Оновити прогрес сканування кожні 10 файлів
                 tracker.update_scan_progress(idx)
         except Exception as exc:
@@ -622,6 +992,11 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
             )
         )
 
+        # Дочекатися хешів усіх файлів - далі ensure_hash вже не читає файли
+        tracker.update_description("dedup", "Обчислення хешів...")
+        hasher.wait()
+        hasher.shutdown()
+
         tracker.update_description("dedup", "Аналіз дублікатів...")
         exact_groups: List[DuplicateGroup] = []
         try:
@@ -643,27 +1018,244 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
         tracker.update_description("dedup", f"Знайдено {len(exact_groups)} груп дублікатів")
         update_progress(run_dir, tracker)
 
+        # Один прохід по групах: інформація про дублікат для кожного файлу та шляхи
+        # дублікатів (крім мастер-файлів), щоб перевірка належності була O(1)
+        duplicates_map: Dict[Path, Dict[str, Optional[str]]] = {}
+        duplicates_files_map: Dict[str, List[Path]] = {}
+        duplicate_paths: set[Path] = set()
+        # Дублікат -> мастер-файл, чий результат обробки він успадковує (вміст ідентичний)
+        canonical_of: Dict[Path, Path] = {}
+        for group in exact_groups:
+            canonical = group.canonical()
+            canonical_path = canonical.path
+            master_str = str(canonical_path)
+            # Мастер-файл першим (V1), решта - за шляхом для стабільних рангів V2, V3...
+            others = sorted(f.path for f in group.files if f.path != canonical_path)
+            duplicates_files_map[group.group_id] = others
+            duplicate_paths.update(others)
+            if canonical.should_process:
+                canonical_of.update(dict.fromkeys(others, canonical_path))
+            for idx, file_path in enumerate([canonical_path, *others], 1):
+                duplicates_map[file_path] = {
+                    "dup_type": "exact_dup",
+                    "dup_group_id": group.group_id,
+                    "dup_rank": f"V{idx}",
+                    "dup_master_path": master_str,
+                }
+
         file_contexts: Dict[Path, FileContext] = {}
+        extract_cache = ExtractionCache()
+        checkpoint = ContextCheckpoint(run_dir)
         tracker.set_stage_total("extract", len(metas_to_process))
         error_count = 0
+        # Шлях -> повідомлення помилки (дублікати успадковують помилку мастер-файлу)
+        file_errors: Dict[Path, str] = {}
+
+        # Класифікація через LLM впирається в мережу, тож до cfg.llm_concurrency запитів
+        # виконуються паралельно, поки основний потік вилучає текст наступних файлів
+        llm_workers = max(1, cfg.llm_concurrency) if llm_client else 1
+        if llm_workers > 1:
+            llm_pool = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm")
+        # (meta, результат вилучення, майбутня класифікація, час початку обробки)
+        pending: Deque[Tuple[FileMeta, ExtractionResult, Future, float]] = deque()
+        # Пакетна класифікація: кілька документів в одному запиті до LLM. Файли чекають
+        # у llm_batch, доки пакет не заповниться; у польоті до llm_workers пакетів
+        batch_size = max(1, cfg.llm_batch_size) if llm_client else 1
+        llm_batch: List[Tuple[Future, str, FileMeta]] = []
+        in_flight_limit = llm_workers * batch_size
+        llm_min_chars = max(1, cfg.llm_min_text_chars)
+
+        def flush_batch() -> None:
+            if not llm_batch:
+                return
+            futures, texts, batch_metas = (list(column) for column in zip(*llm_batch))
+            llm_batch.clear()
+            if llm_pool is not None:
+                llm_pool.submit(_classify_batch_into, futures, texts, batch_metas, llm_client)
+            else:
+                _classify_batch_into(futures, texts, batch_metas, llm_client)
+
+        # Вилучення тексту (OCR, PDF) навантажує CPU, тому виконується в пулі процесів
+        # на кілька файлів наперед, поки основний цикл класифікує попередні. Пул
+        # створюється лише при першому промаху кешу і не більший за кількість файлів,
+        # що ще можуть потребувати вилучення
+        extract_workers = cfg.threads or os.cpu_count() or 1
+        extract_candidates = sum(1 for m in metas if m.should_process and m.path not in canonical_of)
+        # Шлях -> (майбутній результат вилучення, чи взято з кешу)
+        prefetched: Dict[Path, Tuple[Future, bool]] = {}
+        deferred_duplicates: List[FileMeta] = []
+        next_prefetch = 0
+        lookahead = extract_workers * 2 if extract_workers > 1 else 0
+        extract_pool_decided = False
+
+        def get_extract_pool(candidates_left: int) -> Optional[ProcessPoolExecutor]:
+            """Пул вилучення (створюється за першого промаху кешу); None - вилучати в цьому потоці."""
+            nonlocal extract_pool, extract_pool_decided
+            if extract_pool_decided:
+                return extract_pool
+            # Рішення приймається один раз: далі пул лише використовується (або його немає)
+            extract_pool_decided = True
+            workers = min(extract_workers, candidates_left)
+            if workers > 1:
+                # spawn, а не fork: на цей момент уже працюють потоки хешування та дисплея
+                extract_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return extract_pool
+
+        def resume_record(meta: FileMeta) -> Optional[Dict[str, object]]:
+            """Запис перерваного запуску, якщо файл оброблено і його вміст не змінився."""
+            record = resume_records.get(str(meta.path))
+            if record is not None and meta.sha256 and record.get("sha256") == meta.sha256:
+                return record
+            return None
+
+        def prefetch(meta: FileMeta) -> None:
+            """Запустити вилучення тексту файлу (з кешу, якщо вміст файлу не змінився)."""
+            nonlocal extract_candidates
+            if not meta.should_process or meta.path in canonical_of:
+                return
+            # Включно з поточним: стільки файлів ще можуть потрапити в пул
+            candidates_left = extract_candidates
+            extract_candidates -= 1
+            if resume_record(meta) is not None:
+                return
+            extracted: Future = Future()
+            try:
+                # Хешування може не вдатись - обробляємо помилку
+                try:
+                    ensure_hash(meta)
+                except Exception as hash_exc:
+                    tracker.add_error(meta.path.name, f"Помилка хешування: {hash_exc}")
+                    meta.sha256 = None  # Продовжуємо без хешу
+                # Хеш міг з'явитися лише зараз (повторна спроба) - тоді файл береться з журналу
+                if resume_record(meta) is not None:
+                    return
+
+                result = extract_cache.get(meta, ocr_lang)
+                if result is not None:
+                    extracted.set_result(result)
+                    prefetched[meta.path] = (extracted, True)
+                    return
+                pool = get_extract_pool(candidates_left)
+                if pool is not None:
+                    extracted = pool.submit(extract_text, meta, ocr_lang)
+                else:
+                    extracted.set_result(extract_text(meta, ocr_lang))
+            except Exception as exc:
+                extracted.set_exception(exc)
+            prefetched[meta.path] = (extracted, False)
+
+        def fail_file(meta: FileMeta, exc: Exception, stage: str, file_start_time: float) -> None:
+            """Контекст за замовчуванням для файлу, який не вдалося обробити."""
+            nonlocal error_count
+            error_count += 1
+            # НЕ виводимо в консоль під час обробки - щоб не псувати візуал
+            extract_time = time.time() - file_start_time
+
+            # Додати помилку до трекера (буде показано в кінці)
+            file_errors[meta.path] = str(exc)
+            tracker.add_error(meta.path.name, str(exc))
+
+            # Оновити статус помилки (лише якщо файл досі поточний)
+            tracker.set_file_status(
+                str(meta.path),
+                stage=stage,
+                status="error",
+                error_msg=str(exc),
+            )
+
+            file_contexts[meta.path] = FileContext(
+                meta=meta,
+                classification={"category": "інше", "date_doc": None},
+                summary="",
+                category="інше",
+                date_doc=_mtime_date(meta),
+                text_source="error",
+                text_len=0,
+                extract_quality=0.0,
+            )
+
+            # Додати в лог як помилку (метрики оновляться автоматично)
+            tracker.add_to_log(
+                status="error",
+                processing_time={"extract": extract_time},
+                meta=meta,
+            )
+            tracker.increment("extract")
+
+        def finish_file(meta: FileMeta, result: ExtractionResult, classified: Future, file_start_time: float) -> None:
+            """Завершити обробку файлу, коли його класифікація готова."""
+            try:
+                classification, category, date_doc, summary = classified.result()
+            except Exception as exc:
+                fail_file(meta, exc, "classify", file_start_time)
+                return
+
+            # Зберігаємо лише метрики тексту - сам текст звільняється після класифікації
+            ctx = FileContext(
+                meta=meta,
+                classification=classification,
+                summary=summary,
+                category=category,
+                date_doc=date_doc,
+                text_source=result.source,
+                text_len=len(result.text),
+                extract_quality=result.quality,
+            )
+            file_contexts[meta.path] = ctx
+            checkpoint.write(_context_to_record(ctx))
+
+            # Успішно оброблено
+            extract_time = time.time() - file_start_time
+
+            # Оновити статус (лише якщо файл досі поточний - завершення буває відкладеним)
+            tracker.set_file_status(
+                str(meta.path),
+                category=category,
+                stage="classify",
+                status="success",
+            )
+
+            # Додати в лог
+            llm_response = classification.get("summary", "") or summary
+            tracker.add_to_log(
+                status="success",
+                text_length=ctx.text_len,
+                llm_response=llm_response[:100] if llm_response else "",  # Перші 100 символів
+                category=category,
+                processing_time={
+                    "extract": extract_time,
+                    "classify": extract_time,  # Обидва етапи відбуваються разом
+                },
+                meta=meta,
+            )
+            tracker.increment("extract")
+
+        total_files = len(metas)
         for idx, meta in enumerate(metas, 1):
             # Пропустити службові файли (не обробляти, але додати в інвентаризацію)
             if not meta.should_process:
                 # Додати в file_contexts зі статусом "пропущено"
                 file_contexts[meta.path] = FileContext(
                     meta=meta,
-                    text=ExtractionResult(text="", source="skipped", quality=0.0),
                     classification={"category": "[службовий файл]"},
                     summary="",
                     category="[службовий файл]",
-                    date_doc=datetime.fromtimestamp(meta.mtime).date().isoformat(),
+                    date_doc=_mtime_date(meta),
+                    text_source="skipped",
+                    text_len=0,
+                    extract_quality=0.0,
                 )
                 # Збільшити лічильник для правильного прогресу (без додавання в лог)
-                tracker.files_processed += 1
-                tracker.metrics.skipped_count += 1
-                # Оновити дисплей
-                if tracker.live and tracker.use_compact_view:
-                    tracker._update_display_now()
+                tracker.mark_skipped()
+                continue
+
+            # Точний дублікат: не вилучаємо текст і не класифікуємо повторно - контекст
+            # мастер-файлу (він може йти пізніше за списком) копіюється після циклу
+            if meta.path in canonical_of:
+                deferred_duplicates.append(meta)
                 continue
 
             # ВИМКНЕНО: Видалити з черги (черга вимкнена)
@@ -677,109 +1269,99 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
                 status="processing",
             )
 
-            tracker.update_description("extract", f"{meta.path.name} ({idx}/{len(metas)})")
-
-            # Засікти час початку обробки (уникати перезапису глобального start_time)
-            file_start_time = time.time()
-            try:
-                # Хешування може не вдатись - обробляємо помилку
-                try:
-                    ensure_hash(meta)
-                except Exception as hash_exc:
-                    tracker.add_error(meta.path.name, f"Помилка хешування: {hash_exc}")
-                    meta.sha256 = None  # Продовжуємо без хешу
+            tracker.update_description("extract", f"{meta.path.name} ({idx}/{total_files})")
 
-                # Етап 1: Вилучення тексту
-                result = extract_text(meta, cfg.ocr_lang)
+            # Етап 1: Вилучення тексту (запущене наперед у пулі процесів). Prefetch поточного
+            # файлу вже відбувся, тож повторне хешування (якщо пул хешування не впорався)
+            # теж завершене до перевірки відновлення нижче
+            while next_prefetch < total_files and next_prefetch < idx + lookahead:
+                prefetch(metas[next_prefetch])
+                next_prefetch += 1
 
-                # Оновити статус після extract
-                tracker.set_current_file(
-                    name=meta.path.name,
-                    stage="extract",
-                    status="success",
-                )
-
-                # Етап 2: Класифікація через LLM
-                tracker.set_current_file(
-                    name=meta.path.name,
-                    stage="classify",
-                    status="processing",
-                )
-
-                classification = classify_text(result.text, llm_client=llm_client)
-                category = classification.get("category") or "інше"
-                date_doc = classification.get("date_doc") or datetime.fromtimestamp(meta.mtime).date().isoformat()
-                # Якщо LLM повернув summary, використовуємо його
-                summary = classification.get("summary") or summarize_text(result.text, llm_client=llm_client)
-                file_contexts[meta.path] = FileContext(
-                    meta=meta,
-                    text=result,
-                    classification=classification,
-                    summary=summary,
-                    category=category,
-                    date_doc=date_doc,
-                )
-
-                # Успішно оброблено
-                extract_time = time.time() - file_start_time
-
-                # Оновити статус (БЕЗ зміни path!)
-                tracker.set_current_file(
-                    name=meta.path.name,
-                    category=category,
-                    stage="classify",
-                    status="success",
-                )
-
-                # Додати в лог
-                llm_response = classification.get("summary", "") or summary
+            # Відновлення: файл уже оброблено в перерваному запуску і його вміст не змінився
+            record = resume_record(meta)
+            if record is not None:
+                file_contexts[meta.path] = _context_from_record(meta, record)
+                checkpoint.write(record)
                 tracker.add_to_log(
-                    status="success",
-                    text_length=len(result.text),
-                    llm_response=llm_response[:100] if llm_response else "",  # Перші 100 символів
-                    category=category,
-                    processing_time={
-                        "extract": extract_time,
-                        "classify": extract_time,  # Обидва етапи відбуваються разом
-                    },
+                    status="success", text_length=record["text_len"], category=record["category"], meta=meta
                 )
+                tracker.increment("extract")
+                continue
 
+            # Засікти час початку обробки (уникати перезапису глобального start_time)
+            file_start_time = time.time()
+            extracted, from_cache = prefetched.pop(meta.path)
+            try:
+                result = extracted.result()
+                if not from_cache:
+                    extract_cache.put(meta, ocr_lang, result)
             except Exception as exc:
-                # Use fallback values if extraction fails
-                error_count += 1
-                error_msg = f"Не вдалося обробити: {exc}"
-                # НЕ виводимо в консоль під час обробки - щоб не псувати візуал
-                # console.print(markup(THEME.warning, f"⚠ {error_msg}"))
-                extract_time = time.time() - file_start_time
-
-                # Додати помилку до трекера (буде показано в кінці)
-                tracker.add_error(meta.path.name, str(exc))
-
-                # Оновити статус помилки (БЕЗ зміни path!)
-                tracker.set_current_file(
-                    name=meta.path.name,
-                    stage="extract",
-                    status="error",
-                    error_msg=str(exc),
-                )
-
-                file_contexts[meta.path] = FileContext(
-                    meta=meta,
-                    text=ExtractionResult(text="", source="error", quality=0.0),
-                    classification={"category": "інше", "date_doc": None},
-                    summary="",
-                    category="інше",
-                    date_doc=datetime.fromtimestamp(meta.mtime).date().isoformat(),
-                )
-
-                # Додати в лог як помилку (метрики оновляться автоматично)
-                tracker.add_to_log(
-                    status="error",
-                    processing_time={"extract": extract_time},
-                )
+                fail_file(meta, exc, "extract", file_start_time)
+                continue
 
+            # Етап 2: Класифікація через LLM (одразу перекриває статус "extract")
+            tracker.set_current_file(
+                name=meta.path.name,
+                stage="classify",
+                status="processing",
+            )
+            # Порожній або надто короткий текст (шум OCR, підписи) класифікується миттєво
+            # евристиками - без передачі в пул LLM
+            use_llm = llm_client is not None and len(result.text.strip()) >= llm_min_chars
+            if batch_size > 1 and use_llm:
+                classified = Future()
+                llm_batch.append((classified, result.text, meta))
+                if len(llm_batch) >= batch_size:
+                    flush_batch()
+            elif llm_pool is not None and use_llm:
+                classified = llm_pool.submit(_classify_document, result.text, meta, llm_client)
+            else:
+                classified = Future()
+                try:
+                    classified.set_result(_classify_document(result.text, meta, llm_client if use_llm else None))
+                except Exception as exc:
+                    classified.set_exception(exc)
+            pending.append((meta, result, classified, file_start_time))
+
+            # Завершити готові файли по порядку; не тримати більше llm_workers запитів у польоті
+            while pending and (len(pending) > in_flight_limit or pending[0][2].done()):
+                # Перед очікуванням надіслати незаповнений пакет - файл може чекати саме в ньому
+                if llm_batch and not pending[0][2].done():
+                    flush_batch()
+                finish_file(*pending.popleft())
+
+        flush_batch()
+        while pending:
+            finish_file(*pending.popleft())
+
+        for meta in deferred_duplicates:
+            canonical_path = canonical_of[meta.path]
+            ctx = replace(file_contexts[canonical_path], meta=meta)
+            file_contexts[meta.path] = ctx
+            checkpoint.write(_context_to_record(ctx))
+            status = "error" if ctx.text_source == "error" else "success"
+            if status == "error":
+                # Рахується як окрема помилка - так само, як при обробці копії самостійно
+                error_count += 1
+                reason = file_errors.get(canonical_path, "помилка обробки")
+                tracker.add_error(meta.path.name, f"Дублікат {canonical_path.name}: {reason}")
+            tracker.add_to_log(
+                status=status,
+                duplicate_info=f"Дублікат {canonical_path.name} - результат успадковано",
+                text_length=ctx.text_len,
+                category=ctx.category,
+                meta=meta,
+            )
             tracker.increment("extract")
-
+        if extract_pool is not None:
+            extract_pool.shutdown()
+
+        extract_cache.close()
+        checkpoint.close()
+        if llm_client is not None:
+            llm_client.close()
+        tracker.update_metrics(cache_hits=extract_cache.hits, cache_misses=extract_cache.misses)
         update_progress(run_dir, tracker)
 
         tracker.set_stage_total("classify", len(metas))
@@ -787,37 +1369,25 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
         tracker.update_description("classify", "Класифікацію завершено")
         update_progress(run_dir, tracker)
 
-        duplicates_map: Dict[Path, Dict[str, Optional[str]]] = {}
-        duplicates_files_map: Dict[str, List[Path]] = {}
-        for group in exact_groups:
-            canonical = group.canonical()
-            duplicates_files_map[group.group_id] = []
-            ordered_files = sorted(
-                group.files,
-                key=lambda m: (m.path != canonical.path, m.path),
-            )
-            for idx, file_meta in enumerate(ordered_files):
-                info: Dict[str, Optional[str]] = {
-                    "dup_type": "exact_dup",
-                    "dup_group_id": group.group_id,
-                    "dup_rank": f"V{idx + 1}",
-                    "dup_master_path": str(canonical.path),
-                }
-                duplicates_map[file_meta.path] = info
-                if file_meta.path != canonical.path:
-                    duplicates_files_map[group.group_id].append(file_meta.path)
-
-        rename_candidates = [meta for meta in metas if duplicates_map.get(meta.path, {}).get("dup_rank", "V1") == "V1"]
+        # Один прохід: розділити файли на кандидатів (з контекстом) і дублікати.
+        # plan_renames дає план для кожного кандидата, тож без перейменування лишаються дублікати
+        rename_candidates: List[FileMeta] = []
+        unrenamed_metas: List[FileMeta] = []
         contexts_for_rename: Dict[Path, Dict[str, str]] = {}
-        for meta in rename_candidates:
+        for meta in metas:
+            if meta.path in duplicate_paths:
+                unrenamed_metas.append(meta)
+                continue
+            rename_candidates.append(meta)
             ctx = file_contexts[meta.path]
+            yyyy, mm, dd = _split_date(ctx.date_doc)
             # Передаємо повну категорію та дату для нового формату
             contexts_for_rename[meta.path] = {
                 "category": ctx.category,
                 "date_doc": ctx.date_doc,
-                "yyyy": ctx.date_doc[:4] if len(ctx.date_doc) >= 4 else "2024",
-                "mm": ctx.date_doc[5:7] if len(ctx.date_doc) >= 7 else "01",
-                "dd": ctx.date_doc[8:10] if len(ctx.date_doc) >= 10 else "01",
+                "yyyy": yyyy,
+                "mm": mm,
+                "dd": dd,
                 "ext": meta.path.suffix,
             }
 
@@ -830,6 +1400,15 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
             use_short_date=cfg.use_short_date
         )
 
+        # Рядки для файлів без перейменування не залежать ні від підтвердження, ні від
+        # результатів перейменування - будуємо їх у фоні, поки користувач переглядає план
+        # і поки виконуються системні виклики rename (вони звільняють GIL)
+        row_pool = ThreadPoolExecutor(max_workers=1)
+        pending_rows = row_pool.submit(
+            _build_unrenamed_rows,
+            unrenamed_metas, file_contexts, duplicates_map, ocr_lang, cfg.llm_enabled, root, sort_strategy, mode,
+        )
+
         # Попередній перегляд перейменування (тільки для commit режиму)
         if mode == "commit" and rename_plans:
             tracker.stop_visual()
@@ -850,256 +1429,170 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
             tracker.start_visual()
 
         rows: List[InventoryRow] = []
-        row_map: Dict[Path, InventoryRow] = {}
-        path_to_row: Dict[Path, InventoryRow] = {}
+        # Поточний шлях кожного рядка (паралельно до rows) - щоб не розбирати row.path_new знову в Path
+        row_paths: List[Path] = []
 
-        tracker.set_stage_total("rename", len(rename_plans))
+        total_plans = len(rename_plans)
+        tracker.set_stage_total("rename", total_plans)
         renamed_ok = 0
         renamed_failed = 0
-        for idx, plan in enumerate(rename_plans, 1):
-            # Отримати контекст файлу для категорії
-            ctx = file_contexts.get(plan.meta.path)
-            category = ctx.category if ctx else "інше"
+        targets = [plan.meta.path.with_name(plan.new_name) for plan in rename_plans]
 
-            # Встановити поточний файл
+        # Фаза 1: лише перейменування (пакетами) - між системними викликами немає побудови рядків
+        rename_errors: List[Optional[str]] = []
+        for start in range(0, total_plans, RENAME_BATCH_SIZE):
+            batch = rename_plans[start:start + RENAME_BATCH_SIZE]
+            tracker.update_description("rename", f"{start + len(batch)}/{total_plans}")
+            if mode == "commit":
+                errors = apply_renames(
+                    [(str(plan.meta.path), str(target)) for plan, target in zip(batch, targets[start:start + len(batch)])]
+                )
+            else:
+                errors = [None] * len(batch)
+            rename_errors.extend(errors)
+
+            batch_failed = sum(1 for error in errors if error is not None)
+            batch_ok = len(batch) - batch_failed if mode == "commit" else 0
+            renamed_ok += batch_ok
+            renamed_failed += batch_failed
+            tracker.increment("rename", len(batch))
+
+            # Показати останній файл пакета та оновити агреговані лічильники
+            last = batch[-1]
+            last_ctx = file_contexts.get(last.meta.path)
             tracker.set_current_file(
-                name=plan.meta.path.name,
-                path=str(plan.meta.path),
-                category=category,
+                name=last.new_name,
+                category=last_ctx.category if last_ctx else "інше",
                 stage="перейменування",
-                status="processing",
+                status="error" if errors[-1] is not None else "success",
+                error_msg=errors[-1] or "",
             )
-
-            tracker.update_description("rename", f"{plan.meta.path.name} → {plan.new_name} ({idx}/{len(rename_plans)})")
-            target = plan.meta.path.with_name(plan.new_name)
-            status = "skipped" if mode == "dry-run" else "success"
-            error = ""
-            if mode == "commit":
-                try:
-                    plan.meta.path.rename(target)
-                    renamed_ok += 1
-                    # Успішно перейменовано
-                    tracker.set_current_file(
-                        name=plan.new_name,
-                        category=category,
-                        stage="перейменування",
-                        status="success",
-                    )
-                except Exception as exc:
-                    status = "failed"
-                    error = str(exc)
-                    renamed_failed += 1
-                    target = plan.meta.path
-                    # Помилка перейменування
-                    tracker.set_current_file(
-                        name=plan.meta.path.name,
-                        category=category,
-                        stage="перейменування",
-                        status="error",
-                        error_msg=str(exc),
-                    )
-            tracker.increment("rename")
-
-            # Оновити метрики успішності
-            # Оновити агреговані лічильники, не обнуляючи попередні значення
-            current_success = tracker.metrics.success_count
-            current_errors = tracker.metrics.error_count
-            if status == "success":
-                current_success += 1
-            elif status == "failed":
-                current_errors += 1
-
             tracker.update_metrics(
-                success_count=current_success,
-                error_count=current_errors,
+                success_count=tracker.metrics.success_count + batch_ok,
+                error_count=tracker.metrics.error_count + batch_failed,
             )
 
+        # Фаза 2: рядки інвентаризації за результатами перейменування
+        planned_status = "skipped" if mode == "dry-run" else "success"
+        root_str = str(root)
+        llm_used = cfg.llm_enabled
+        for plan, target, rename_error in zip(rename_plans, targets, rename_errors):
             meta_path = plan.meta.path
-            ctx = file_contexts[meta_path]
-            dup_info = duplicates_map.get(
-                meta_path,
-                {"dup_type": "unique", "dup_group_id": None, "dup_rank": "V1", "dup_master_path": None},
-            )
-            row = InventoryRow(
-                root=str(root),
-                folder_old=str(meta_path.parent),
-                path_old=str(meta_path),
-                name_old=meta_path.name,
-                name_new=target.name,
-                folder_new=str(target.parent),
-                path_new=str(target),
-                sorted=False,
-                sort_strategy=sort_strategy or "",
-                sorted_subfolder="",
-                path_final=str(target),
-                ext=meta_path.suffix.lower(),
-                mime=mimetypes.guess_type(meta_path.name)[0] or "application/octet-stream",
-                size_mb=plan.meta.size / (1024 * 1024),
-                ctime=datetime.fromtimestamp(plan.meta.ctime),
-                mtime=datetime.fromtimestamp(plan.meta.mtime),
-                date_doc=ctx.date_doc,
-                category=ctx.category,
-                short_title=ctx.summary,
-                version="01",
-                hash8=(plan.meta.sha256 or "0" * 8)[:8],
-                content_hash_sha256=plan.meta.sha256 or "",
-                dup_type=dup_info["dup_type"],
-                dup_group_id=dup_info["dup_group_id"],
-                dup_rank=dup_info["dup_rank"],
-                dup_master_path=dup_info["dup_master_path"],
-                near_dup_score=None,
-                lifecycle_state="present",
-                deleted_ts=None,
-                text_source=ctx.text.source,
-                ocr_lang=cfg.ocr_lang,
-                text_len=len(ctx.text.text),
-                extract_quality=ctx.text.quality,
-                llm_used=cfg.llm_enabled,
-                llm_confidence=None,
-                llm_keywords="",
-                summary_200=ctx.summary,
-                rename_status=status,
-                error_message=error,
-                collision=plan.collision,
-                duration_s=0.0,
-                mode=mode,
+            status = planned_status
+            error = ""
+            if rename_error is not None:
+                status = "failed"
+                error = rename_error
+                target = meta_path
+            row = _build_row(
+                plan.meta,
+                file_contexts[meta_path],
+                duplicates_map.get(meta_path, _UNIQUE_DUP_INFO),
+                target,
+                status,
+                error,
+                plan.collision,
+                ocr_lang,
+                llm_used,
+                root_str,
+                sort_strategy,
+                mode,
             )
             rows.append(row)
-            row_map[meta_path] = row
-            path_to_row[Path(row.path_new)] = row
+            row_paths.append(target)
         update_progress(run_dir, tracker)
 
-        for meta in metas:
-            if meta.path in row_map:
-                continue
-            ctx = file_contexts[meta.path]
-            dup_info = duplicates_map.get(
-                meta.path,
-                {"dup_type": "unique", "dup_group_id": None, "dup_rank": "V1", "dup_master_path": None},
-            )
-            row = InventoryRow(
-                root=str(root),
-                folder_old=str(meta.path.parent),
-                path_old=str(meta.path),
-                name_old=meta.path.name,
-                name_new=meta.path.name,
-                folder_new=str(meta.path.parent),
-                path_new=str(meta.path),
-                sorted=False,
-                sort_strategy=sort_strategy or "",
-                sorted_subfolder="",
-                path_final=str(meta.path),
-                ext=meta.path.suffix.lower(),
-                mime=mimetypes.guess_type(meta.path.name)[0] or "application/octet-stream",
-                size_mb=meta.size / (1024 * 1024),
-                ctime=datetime.fromtimestamp(meta.ctime),
-                mtime=datetime.fromtimestamp(meta.mtime),
-                date_doc=ctx.date_doc,
-                category=ctx.category,
-                short_title=ctx.summary,
-                version="01",
-                hash8=(meta.sha256 or "0" * 8)[:8],
-                content_hash_sha256=meta.sha256 or "",
-                dup_type=dup_info["dup_type"],
-                dup_group_id=dup_info["dup_group_id"],
-                dup_rank=dup_info["dup_rank"],
-                dup_master_path=dup_info["dup_master_path"],
-                near_dup_score=None,
-                lifecycle_state="present",
-                deleted_ts=None,
-                text_source=ctx.text.source,
-                ocr_lang=cfg.ocr_lang,
-                text_len=len(ctx.text.text),
-                extract_quality=ctx.text.quality,
-                llm_used=cfg.llm_enabled,
-                llm_confidence=None,
-                llm_keywords="",
-                summary_200=ctx.summary,
-                rename_status="skipped",
-                error_message="",
-                collision=False,
-                duration_s=0.0,
-                mode=mode,
-            )
-            rows.append(row)
-            row_map[meta.path] = row
-            path_to_row[Path(row.path_new)] = row
+        # Рядки для файлів без перейменування (підготовлені у фоні) - це дублікати.
+        # Лише їх змінюють видалення та карантин, тож за шляхом індексуються тільки вони
+        duplicate_rows = pending_rows.result()
+        row_pool.shutdown()
+        for row in duplicate_rows.values():
+            row.mode = mode  # Режим міг змінитись на dry-run, якщо користувач відмовився
+        rows.extend(duplicate_rows.values())
+        row_paths.extend(duplicate_rows)
 
         deleted_set: set[Path] = set()
-        quarantine_updates: Dict[Path, str] = {}
-        duplicates_flat = [path for paths in duplicates_files_map.values() for path in paths]
-        if mode == "commit" and duplicates_flat:
+        quarantine_updates: Dict[Path, Path] = {}
+        if mode == "commit" and duplicate_paths:
             if delete_exact:
-                delete_duplicates(duplicates_flat)
-                deleted_set.update(duplicates_flat)
+                delete_duplicates(duplicate_paths)
+                deleted_set.update(duplicate_paths)
             else:
                 # Переміщуємо дублікати в папку "duplicates" в корені сканованої папки
-                mapping = quarantine_files(root, duplicates_files_map)
-                for original, new_path in mapping.items():
-                    quarantine_updates[original] = str(new_path)
+                quarantine_updates.update(quarantine_files(root, duplicates_files_map))
 
         sorted_updates: Dict[Path, Path] = {}
+        sortable_rows: Dict[Path, InventoryRow] = {}
         if mode == "commit" and sort_strategy:
-            excluded = {Path(str(p)) for p in deleted_set.union(quarantine_updates.keys())}
-            sortable_paths = [
-                Path(row.path_new)
-                for row in rows
-                if row.lifecycle_state == "present" and Path(row.path_new) not in excluded
-            ]
-            sorted_mapping = sort_files(get_output_dir(), sortable_paths, sort_strategy, cfg.sorted_root)
+            # Шляхи рядків уже є як Path - нічого не розбираємо з рядків
+            excluded = deleted_set | quarantine_updates.keys()
+            sortable_rows = {
+                path: row
+                for path, row in zip(row_paths, rows)
+                if row.lifecycle_state == "present" and path not in excluded
+            }
+            sorted_mapping = sort_files(get_output_dir(), list(sortable_rows), sort_strategy, cfg.sorted_root)
             sorted_updates.update(sorted_mapping)
 
         if deleted_set or quarantine_updates:
             now = datetime.now(timezone.utc)
             for original in deleted_set:
-                row = row_map.get(original)
-                if not row:
-                    row = path_to_row.get(original)
+                row = duplicate_rows.get(original)
                 if not row:
                     continue
                 row.lifecycle_state = "deleted"
                 row.deleted_ts = now
                 row.path_final = ""
-            for original, state in quarantine_updates.items():
-                row = row_map.get(original)
-                if not row:
-                    row = path_to_row.get(original)
+            for original, new_path in quarantine_updates.items():
+                row = duplicate_rows.get(original)
                 if not row:
                     continue
                 row.lifecycle_state = "quarantined"
-                row.path_final = state
-                path_to_row[Path(state)] = row
+                row.path_final = str(new_path)
 
         if sorted_updates:
             for original, new_path in sorted_updates.items():
-                row = path_to_row.get(original)
+                row = sortable_rows.get(original)
                 if not row:
                     continue
                 row.sorted = True
                 row.sort_strategy = sort_strategy or ""
-                row.sorted_subfolder = str(Path(new_path).parent)
+                row.sorted_subfolder = str(new_path.parent)
                 row.path_final = str(new_path)
-                path_to_row[Path(new_path)] = row
 
         tracker.increment("inventory")
         duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+        # Агрегати для підсумку - за один прохід по рядках
+        ocr_count = 0
+        llm_count = 0
+        collision_count = 0
+        total_size_mb = 0.0
+        for row in rows:
+            if row.text_source == "ocr":
+                ocr_count += 1
+            if row.llm_used:
+                llm_count += 1
+            if row.collision:
+                collision_count += 1
+            total_size_mb += row.size_mb
+        rows_count = len(rows)
         summary = RunSummary(
             run_id=run_id,
             files_total=len(metas),
-            files_processed=len(rows),
+            files_processed=rows_count,
             renamed_ok=renamed_ok,
             renamed_failed=renamed_failed,
             duplicate_groups=len(exact_groups),
-            duplicate_files=len(duplicates_flat),
+            duplicate_files=len(duplicate_paths),
             near_duplicate_files=0,
             quarantined_count=len(quarantine_updates),
             deleted_count=len(deleted_set),
-            ocr_share=sum(1 for row in rows if row.text_source == "ocr") / len(rows) if rows else 0.0,
-            llm_share=sum(1 for row in rows if row.llm_used) / len(rows) if rows else 0.0,
-            collisions=sum(1 for row in rows if row.collision),
+            ocr_share=ocr_count / rows_count if rows_count else 0.0,
+            llm_share=llm_count / rows_count if rows_count else 0.0,
+            collisions=collision_count,
             duration_total_s=duration,
             cost_total_usd=0.0,
-            total_size_mb=sum(row.size_mb for row in rows),
+            total_size_mb=total_size_mb,
             sorted_enabled=bool(sort_strategy),
             sorting_strategy=sort_strategy or "",
             moved_count=len(quarantine_updates) + len(sorted_updates),
@@ -1109,6 +1602,13 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
 
         try:
             write_inventory(rows, summary, run_dir)
+            # Перерваний запуск (і ланцюжок запусків, які він сам відновлював) завершено -
+            # більше не пропонувати їх для відновлення
+            source = resume_from
+            while source is not None and source.is_dir():
+                mark_resumed(source, run_id)
+                previous = load_run_info(source).get("resumed_from")
+                source = source.parent / previous if previous else None
             update_progress(run_dir, tracker)
             tracker.stop_visual()
 
@@ -1116,10 +1616,15 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
             tracker.print_error_report()
 
             console.print(format_status(f"\nЗавершено. Дані у {run_dir}", is_error=False))
-            console.print(f"{markup(THEME.header, 'Оброблено файлів:')} {format_number(summary.files_processed)}")
-            console.print(f"{markup(THEME.header, 'Перейменовано:')} {format_number(summary.renamed_ok)}")
+            summary_lines = [
+                f"{_LBL_PROCESSED} {format_number(summary.files_processed)}",
+                f"{_LBL_RENAMED} {format_number(summary.renamed_ok)}",
+            ]
             if summary.duplicate_files > 0:
-                console.print(f"{markup(THEME.duplicate, 'Дублікатів:')} {format_number(summary.duplicate_files, THEME.duplicate_count)}")
+                summary_lines.append(f"{_LBL_DUPLICATES} {format_number(summary.duplicate_files, THEME.duplicate_count)}")
+            if tracker.metrics.cache_hits > 0:
+                summary_lines.append(f"{_LBL_CACHE_HITS} {format_number(tracker.metrics.cache_hits)}")
+            console.print("\n".join(summary_lines))
 
             # Статистика LLM
             if llm_client:
@@ -1131,8 +1636,8 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
                         llm_responses=stats["requests"]  # Кількість відповідей = кількості запитів
                     )
                     console.print(
-                        f"{markup(THEME.llm_request, '🤖 LLM запитів:')} {format_number(stats['requests'])}, "
-                        f"{markup(THEME.llm_request, 'токенів:')} {format_number(stats['tokens'])}"
+                        f"{_LBL_LLM_REQUESTS} {format_number(stats['requests'])}, "
+                        f"{_LBL_LLM_TOKENS} {format_number(stats['tokens'])}"
                     )
         except Exception as exc:
             tracker.stop_visual()
@@ -1148,6 +1653,21 @@ def execute_pipeline(cfg: Config, mode: str, delete_exact: bool = False, sort_st
         console.print(f"\n{markup(THEME.dim_text, 'Детальна інформація:')}")
         console.print(markup(THEME.dim_text, traceback.format_exc()))
         raise  # Передаємо помилку вище
+    finally:
+        # Дописати журнал навіть при перериванні (Ctrl+C), щоб запуск можна було відновити
+        if checkpoint is not None:
+            checkpoint.close()
+        if extract_cache is not None:
+            extract_cache.close()
+        if llm_pool is not None:
+            llm_pool.shutdown(wait=False, cancel_futures=True)
+        if extract_pool is not None:
+            extract_pool.shutdown(wait=False, cancel_futures=True)
+        if hasher is not None:
+            hasher.shutdown(cancel=True)
+        # Після зупинки пулу класифікації: HTTP-сесії та кеш відповідей LLM
+        if llm_client is not None:
+            llm_client.close()
 
 
 def update_progress(run_dir: Path, tracker: ProgressTracker) -> None:
@@ -1156,9 +1676,12 @@ def update_progress(run_dir: Path, tracker: ProgressTracker) -> None:
         "eta_seconds": tracker.eta_seconds(),
         "stages": tracker.snapshot(),
     }
+    # Папку запуску вже створено в setup_logging; файл перезаписується часто, тож без відступів.
+    # Запис у тимчасовий файл і os.replace - читач ніколи не побачить напівзаписаний JSON
     progress_path = run_dir / "progress.json"
-    progress_path.parent.mkdir(parents=True, exist_ok=True)
-    progress_path.write_text(json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path = run_dir / "progress.json.tmp"
+    tmp_path.write_bytes(jsonx.dumps_bytes(snapshot))
+    os.replace(tmp_path, progress_path)
 
 
 if __name__ == "__main__":
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 import time
+import functools
 import hashlib
 import threading
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Tuple, Optional, List
+from typing import Dict, Iterable, Tuple, Optional, List, TYPE_CHECKING
 from pathlib import Path
 
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
@@ -29,7 +30,21 @@ from .hacker_ui import (
     render_queue,
 )
 
+if TYPE_CHECKING:
+    from .scan import FileMeta
+
 WINDOW = 10
+# Мінімальний інтервал між перемальовуваннями Live display (часті оновлення об'єднуються)
+DISPLAY_MIN_INTERVAL = 0.1
+
+
+def _locked(method):
+    """Виконати метод трекера під замком стану - спільним з потоком перемальовування."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._state_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 @dataclass
@@ -55,6 +70,8 @@ class ProcessingMetrics:
     skipped_count: int = 0
     llm_requests: int = 0
     llm_responses: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
 
 
 @dataclass
@@ -121,6 +138,7 @@ class ProgressTracker:
         self.all_files: List[str] = []  # ВСІ файли для обробки
         self.current_file_index: int = 0  # Поточний індекс в all_files
         self.hex_counter = 0x7F8A  # Лічильник для генерації hex адрес
+        self._file_ids: Dict[str, str] = {}  # Шлях -> hex ID файлу, ще не доданого в лог
         self.files_processed: int = 0  # Скільки файлів оброблено
         self.total_files: int = 0  # Загальна кількість файлів
         self.files_scanned: int = 0  # Скільки файлів знайдено під час сканування
@@ -135,25 +153,60 @@ class ProgressTracker:
         # Окремий потік для оновлення таймера
         self._refresh_thread: Optional[threading.Thread] = None
         self._stop_refresh = threading.Event()
+        self._last_render = 0.0
+        self._display_dirty = False
+        # Потік оновлення читає стан під час рендерингу, а основний потік змінює його.
+        # RLock: змінюючі методи викликають один одного та рендеринг у тому ж потоці
+        self._state_lock = threading.RLock()
 
     def _refresh_loop(self) -> None:
-        """Окремий потік для оновлення дисплея кожну секунду (для таймера)."""
-        while not self._stop_refresh.is_set():
-            if self.live and self.use_compact_view:
-                try:
-                    self.live.update(self._render_display())
-                except Exception:
-                    pass  # Ігнорувати помилки під час оновлення
-            time.sleep(1.0)  # Оновлювати кожну секунду
-
-    def _update_display_now(self) -> None:
-        """Оновити дисплей ЗАВЖДИ (без throttling)."""
-        if self.live and self.use_compact_view:
+        """Окремий потік: домальовує відкладені оновлення та оновлює таймер щосекунди."""
+        while not self._stop_refresh.wait(DISPLAY_MIN_INTERVAL):
+            if self._display_dirty or time.monotonic() - self._last_render >= 1.0:
+                self._render_now()
+
+    def _render_now(self) -> None:
+        """
+        Перемалювати дисплей негайно.
+
+        Знімок стану будується під замком; виведення в термінал - вже без нього.
+        Якщо кадр не вдалося побудувати чи вивести, дисплей лишається застарілим
+        і потік оновлення повторить спробу на наступному такті.
+        """
+        with self._state_lock:
+            live = self.live
+            if not (live and self.use_compact_view):
+                self._display_dirty = False
+                return
+            self._last_render = time.monotonic()
             try:
-                self.live.update(self._render_display(), refresh=True)
+                renderable = self._render_display()
             except Exception:
-                pass  # Ігнорувати помилки оновлення
+                self._display_dirty = True
+                return
+            self._display_dirty = False
+        try:
+            live.update(renderable, refresh=True)
+        except Exception:
+            self._display_dirty = True
 
+    def _update_display_now(self) -> None:
+        """
+        Оновити дисплей.
+
+        Поки працює потік оновлення, виклик лише позначає дисплей як застарілий:
+        усі зміни стану за DISPLAY_MIN_INTERVAL збираються в одне перемальовування
+        у потоці оновлення, і цикл обробки файлів не чекає на Rich.
+        """
+        if not (self.live and self.use_compact_view):
+            return
+        refresh_running = self._refresh_thread is not None and self._refresh_thread.is_alive()
+        if refresh_running or time.monotonic() - self._last_render < DISPLAY_MIN_INTERVAL:
+            self._display_dirty = True
+            return
+        self._render_now()
+
+    @_locked
     def update_scan_progress(self, files_found: int) -> None:
         """Оновити прогрес сканування (викликається для кожного знайденого файлу)."""
         self.files_scanned = files_found
@@ -167,6 +220,7 @@ class ProgressTracker:
             if self.live:
                 self._update_display_now()
 
+    @_locked
     def finish_scan(self, total_files: int) -> None:
         """Завершити сканування і встановити загальну кількість файлів."""
         self.scanning_active = False
@@ -174,11 +228,13 @@ class ProgressTracker:
         self.files_scanned = total_files
         self._update_display_now()
 
+    @_locked
     def update_stage_progress(self, stage: str, progress: float, elapsed_time: float) -> None:
         """Оновити прогрес конкретного етапу для поточного файлу."""
         self.current_stage_progress[stage] = {"progress": progress, "time": elapsed_time}
         self._update_display_now()
 
+    @_locked
     def add_error(self, file_name: str, error_message: str) -> None:
         """Додати помилку до списку помилок."""
         timestamp = time.strftime("%H:%M:%S")
@@ -205,7 +261,10 @@ class ProgressTracker:
             )
             self.live.start()
             # Примусово оновити після старту
-            self._update_display_now()
+            self._render_now()
+            self._stop_refresh.clear()
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresh_thread.start()
         else:
             # Старий вигляд: окремі етапи
             self.progress = Progress(
@@ -233,6 +292,7 @@ class ProgressTracker:
                 )
                 self.task_ids[stage_name] = task_id
 
+    @_locked
     def set_all_totals(self, total: int) -> None:
         """Встановити total для всіх етапів після сканування"""
         for stage in self.stages.keys():
@@ -255,6 +315,9 @@ class ProgressTracker:
             self._refresh_thread.join(timeout=2.0)
 
         if self.live:
+            # Показати останній стан, якщо оновлення було відкладене
+            if self._display_dirty:
+                self._render_now()
             self.live.stop()
             self.live = None
         if self.progress:
@@ -273,6 +336,7 @@ class ProgressTracker:
         }
         return translations.get(stage, stage)
 
+    @_locked
     def set_stage_total(self, stage: str, total: int) -> None:
         if stage in self.stages:
             self.stages[stage].total = total
@@ -280,6 +344,7 @@ class ProgressTracker:
             if self.progress and stage in self.task_ids:
                 self.progress.update(self.task_ids[stage], total=total)
 
+    @_locked
     def increment(self, stage: str, amount: int = 1) -> None:
         if stage not in self.stages:
             return
@@ -302,6 +367,14 @@ class ProgressTracker:
             elif stage in self.task_ids:
                 self.progress.update(self.task_ids[stage], completed=sp.completed)
 
+    @_locked
+    def mark_skipped(self) -> None:
+        """Врахувати службовий файл: він рахується обробленим, але не потрапляє в лог."""
+        self.files_processed += 1
+        self.metrics.skipped_count += 1
+        self._update_display_now()
+
+    @_locked
     def update_metrics(
         self,
         duplicate_groups: int | None = None,
@@ -311,6 +384,8 @@ class ProgressTracker:
         skipped_count: int | None = None,
         llm_requests: int | None = None,
         llm_responses: int | None = None,
+        cache_hits: int | None = None,
+        cache_misses: int | None = None,
     ) -> None:
         """Оновити агреговані метрики."""
         if duplicate_groups is not None:
@@ -327,10 +402,15 @@ class ProgressTracker:
             self.metrics.llm_requests = llm_requests
         if llm_responses is not None:
             self.metrics.llm_responses = llm_responses
+        if cache_hits is not None:
+            self.metrics.cache_hits = cache_hits
+        if cache_misses is not None:
+            self.metrics.cache_misses = cache_misses
 
         # Оновити Live display (з throttling)
         self._update_display_now()
 
+    @_locked
     def set_current_file(
         self,
         name: str = "",
@@ -369,6 +449,9 @@ class ProgressTracker:
         if name:
             self.current_file.hex_id = generate_hex_id(self.hex_counter)
             self.hex_counter += 1
+            if path:
+                # Файл може потрапити в лог пізніше, коли поточним уже буде інший
+                self._file_ids[path] = self.current_file.hex_id
 
         # Отримати розмір та час модифікації (ШВИДКО)
         if path:
@@ -385,6 +468,32 @@ class ProgressTracker:
         if self.live and self.use_compact_view:
             self._update_display_now()
 
+    @_locked
+    def set_file_status(
+        self,
+        path: str,
+        category: str = "",
+        stage: str = "",
+        status: str = "",
+        error_msg: str = "",
+    ) -> None:
+        """
+        Оновити статус файлу, лише якщо він досі поточний.
+
+        Файли завершуються із запізненням (пакети LLM, пул вилучення): на той час
+        поточним може бути вже інший файл, і панель не повинна повертатися назад.
+        """
+        if not path or path != self.current_file.path:
+            return
+        self.set_current_file(
+            name=self.current_file.name,
+            category=category,
+            stage=stage,
+            status=status,
+            error_msg=error_msg,
+        )
+
+    @_locked
     def add_to_log(
         self,
         status: str,
@@ -394,18 +503,42 @@ class ProgressTracker:
         category: str = "",
         destination: str = "",
         processing_time: Dict[str, float] = None,
+        meta: Optional[FileMeta] = None,
     ) -> None:
-        """Додати поточний файл до логу оброблених."""
-        if not self.current_file.name:
+        """
+        Додати файл до логу оброблених.
+
+        Args:
+            meta: Метадані файлу запису (None - поточний файл). Потрібні, коли файл
+                завершується після того, як поточним став наступний
+        """
+        if meta is not None:
+            path = str(meta.path)
+            hex_id = self._file_ids.pop(path, "")
+            if not hex_id:
+                hex_id = generate_hex_id(self.hex_counter)
+                self.hex_counter += 1
+            filename = meta.path.name
+            size = meta.size
+            modified_time = meta.mtime
+            sha_hash = (meta.sha256 or "")[:6]
+        elif self.current_file.name:
+            self._file_ids.pop(self.current_file.path, None)
+            hex_id = self.current_file.hex_id
+            filename = self.current_file.name
+            size = self.current_file.size
+            modified_time = self.current_file.modified_time
+            sha_hash = self.current_file.sha_hash
+        else:
             return
 
         entry = FileLogEntry(
-            hex_id=self.current_file.hex_id,
+            hex_id=hex_id,
             timestamp=time.strftime("%H:%M:%S"),
-            filename=self.current_file.name,
-            size=self.current_file.size,
-            modified_date=format_date(self.current_file.modified_time),
-            sha_hash=self.current_file.sha_hash,
+            filename=filename,
+            size=size,
+            modified_date=format_date(modified_time),
+            sha_hash=sha_hash,
             status=status,
             duplicate_info=duplicate_info,
             text_length=text_length,
@@ -433,6 +566,7 @@ class ProgressTracker:
         if self.live and self.use_compact_view:
             self._update_display_now()
 
+    @_locked
     def populate_queue(self, file_paths: List[str]) -> None:
         """Заповнити чергу файлів - зберігає ВСІ файли, показує тільки 5."""
         from pathlib import Path
@@ -475,6 +609,7 @@ class ProgressTracker:
         if self.live and self.use_compact_view:
             self._update_display_now()
 
+    @_locked
     def remove_from_queue(self, filename: str) -> None:
         """Видалити файл з черги - просто переходимо до наступного."""
         # Збільшити індекс поточного файлу
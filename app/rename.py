@@ -1,10 +1,15 @@
 """File renaming utilities."""
 from __future__ import annotations
 
+import ctypes
+import errno
+import os
 import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 from unidecode import unidecode
 
@@ -13,6 +18,10 @@ from .config import MAX_FILENAME_LENGTH
 
 INVALID_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
 SAFE_CHARS_ONLY = re.compile(r"[^A-Za-z0-9_-]+")
+# Скільки перейменувань виконувати між оновленнями інтерфейсу
+RENAME_BATCH_SIZE = 128
+# Контекст за замовчуванням для файлів без контексту (спільний, лише для читання)
+_EMPTY_CONTEXT: Mapping[str, str] = MappingProxyType({})
 
 
 def slugify(text: str, limit: int = 50) -> str:
@@ -172,7 +181,8 @@ def plan_renames(
     used: Dict[Path, set[str]] = {}
 
     for meta in sorted(files, key=lambda m: str(m.path)):
-        ctx = contexts.get(meta.path, {}).copy()
+        # Копія потрібна лише шаблонному формату (він доповнює контекст) - тут тільки читання
+        ctx = contexts.get(meta.path, _EMPTY_CONTEXT)
         parent = meta.path.parent
         used.setdefault(parent, set())
 
@@ -238,6 +248,7 @@ def plan_renames(
 
         else:
             # Старий формат через шаблон (для зворотної сумісності)
+            ctx = dict(ctx)
             ctx.setdefault("short_title", slugify(ctx.get("short_title", meta.path.stem)))
             ctx.setdefault("hash8", (meta.sha256 or "0" * 8)[:8])
             ctx.setdefault("ext", meta.path.suffix)
@@ -266,3 +277,72 @@ def plan_renames(
 
     return plans
 
+
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+
+
+def _load_renameat2():
+    """renameat2() з libc (Linux); None, якщо недоступна."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    func.restype = ctypes.c_int
+    return func
+
+
+_RENAMEAT2 = _load_renameat2()
+
+
+def rename_noreplace(src: str, dst: str) -> None:
+    """
+    Перейменувати файл, не перезаписуючи наявний.
+
+    На Linux перевірка виконується атомарно ядром (renameat2 + RENAME_NOREPLACE).
+    На Windows os.rename і так не перезаписує ціль. В інших випадках -
+    перевірка існування перед os.rename.
+
+    Raises:
+        FileExistsError: Якщо ціль уже існує
+        OSError: Інші помилки перейменування
+    """
+    if src == dst:  # Ім'я вже відповідає плану
+        return
+    if _RENAMEAT2 is not None:
+        if _RENAMEAT2(AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dst), RENAME_NOREPLACE) == 0:
+            return
+        err = ctypes.get_errno()
+        if err not in (errno.EINVAL, errno.ENOSYS):  # Файлова система не підтримує прапорець
+            raise OSError(err, os.strerror(err), src, None, dst)
+    if os.name != "nt" and os.path.lexists(dst):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), src, None, dst)
+    os.rename(src, dst)
+
+
+def apply_renames(pairs: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+    """
+    Виконати пакет перейменувань.
+
+    Перейменування йдуть строго послідовно: ціль одного файлу може бути
+    старим іменем іншого, тож порядок має значення. Наявні файли не
+    перезаписуються - така пара отримує помилку.
+
+    Args:
+        pairs: Пари (старий шлях, новий шлях) у вигляді рядків
+
+    Returns:
+        Для кожної пари None при успіху або текст помилки
+    """
+    rename = rename_noreplace
+    errors: List[Optional[str]] = []
+    for src, dst in pairs:
+        try:
+            rename(src, dst)
+            errors.append(None)
+        except OSError as exc:
+            errors.append(str(exc))
+    return errors
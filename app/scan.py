@@ -3,15 +3,12 @@ from __future__ import annotations
 
 import hashlib
 import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Iterator, List
-from fnmatch import fnmatch
-
-try:
-    from chardet import detect
-except ImportError:  # pragma: no cover - fallback when dependency missing
-    detect = None
+from fnmatch import translate
 
 
 @dataclass
@@ -36,6 +33,42 @@ def to_long_path(path: Path) -> Path:
     return path
 
 
+class _FileFilter:
+    """Правила фільтрації сканування, підготовлені один раз: множини та один регулярний вираз."""
+
+    def __init__(
+        self,
+        exclude_dirs: Iterable[str],
+        exclude_files: Iterable[str],
+        include_extensions: Iterable[str],
+        use_extension_filter: bool = True,
+    ):
+        self.exclude_dirs = frozenset(exclude_dirs)
+        # Усі патерни в одному виразі замість fnmatch на кожен патерн. fnmatch порівнює
+        # після os.path.normcase, тож на Windows - без урахування регістру
+        patterns = [translate(pattern) for pattern in exclude_files]
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        self.exclude_files = re.compile("|".join(patterns), flags) if patterns else None
+        self.include_extensions = frozenset(include_extensions)
+        self.use_extension_filter = use_extension_filter
+
+    def __call__(self, path: Path, root: Path) -> bool:
+        # Перевірити чи файл в виключених папках (всі частини шляху крім імені файлу)
+        relative_path = path.relative_to(root) if path.is_relative_to(root) else path
+        if not self.exclude_dirs.isdisjoint(relative_path.parts[:-1]):
+            return False
+
+        # Перевірити чи ім'я файлу відповідає виключеним патернам
+        if self.exclude_files is not None and self.exclude_files.match(path.name):
+            return False
+
+        # Якщо увімкнено фільтр розширень, перевірити чи розширення в списку дозволених
+        if self.use_extension_filter and path.suffix.lower() not in self.include_extensions:
+            return False
+
+        return True
+
+
 def should_process_file(
     path: Path,
     root: Path,
@@ -58,27 +91,39 @@ def should_process_file(
     Returns:
         True якщо файл потрібно обробляти, False якщо ігнорувати
     """
-    # Перевірити чи файл в виключених папках
-    relative_path = path.relative_to(root) if path.is_relative_to(root) else path
-    path_parts = relative_path.parts
-
-    for part in path_parts[:-1]:  # Перевірити всі частини шляху крім імені файлу
-        if part in exclude_dirs:
-            return False
+    return _FileFilter(exclude_dirs, exclude_files, include_extensions, use_extension_filter)(path, root)
 
-    # Перевірити чи ім'я файлу відповідає виключеним патернам
-    filename = path.name
-    for pattern in exclude_files:
-        if fnmatch(filename, pattern):
-            return False
 
-    # Якщо увімкнено фільтр розширень, перевірити чи розширення в списку дозволених
-    if use_extension_filter:
-        ext = path.suffix.lower()
-        if ext not in include_extensions:
-            return False
+def _walk_files(root: Path) -> Iterator[os.DirEntry]:
+    """
+    Обійти дерево як os.walk (згори вниз, без переходу за посиланнями на папки),
+    повертаючи DirEntry файлів.
 
-    return True
+    DirEntry.stat() на Windows бере розмір і час із самого читання папки - без окремого
+    системного виклику на кожен файл.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        top = stack.pop()
+        try:
+            scandir_it = os.scandir(top)
+        except OSError:
+            continue
+        files: List[os.DirEntry] = []
+        subdirs: List[str] = []
+        with scandir_it:
+            for entry in scandir_it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry)
+                elif not entry.is_symlink():
+                    subdirs.append(entry.path)
+        yield from files
+        # Зворотний порядок у стеку - підпапки обходяться в порядку читання, як в os.walk
+        stack.extend(reversed(subdirs))
 
 
 def scan_directory(
@@ -114,46 +159,63 @@ def scan_directory_progressive(
     Yields:
         FileMeta: Метадані кожного знайденого файлу по одному
     """
-    exclude_dirs = exclude_dirs or []
-    exclude_files = exclude_files or []
-    include_extensions = include_extensions or []
-
-    for dirpath, _, filenames in os.walk(root):
-        for name in filenames:
-            path = Path(dirpath) / name
-            try:
-                stat = path.stat()
-            except OSError:
-                continue
-
-            # Перевірити чи потрібно обробляти файл
-            process = should_process_file(
-                path,
-                root,
-                exclude_dirs,
-                exclude_files,
-                include_extensions,
-                use_extension_filter,
-            )
-
-            yield FileMeta(
-                path=path,
-                size=stat.st_size,
-                ctime=stat.st_ctime,
-                mtime=stat.st_mtime,
-                should_process=process,
-            )
-
-
-def compute_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    hasher = hashlib.sha256()
+    # Правила готуються один раз на сканування, а не на кожен файл
+    should_process = _FileFilter(
+        exclude_dirs or [], exclude_files or [], include_extensions or [], use_extension_filter
+    )
+
+    for entry in _walk_files(root):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        path = Path(entry.path)
+
+        # Перевірити чи потрібно обробляти файл
+        process = should_process(path, root)
+
+        yield FileMeta(
+            path=path,
+            size=stat.st_size,
+            ctime=stat.st_ctime,
+            mtime=stat.st_mtime,
+            should_process=process,
+        )
+
+
+def filter_existing_files(paths: Iterable[str]) -> List[Path]:
+    """
+    Залишити тільки існуючі файли, зберігаючи вхідний порядок.
+
+    Замість stat на кожен файл кожна батьківська папка читається один раз через os.scandir.
+
+    Args:
+        paths: Шляхи до файлів (рядки; порожні значення ігноруються)
+
+    Returns:
+        Список Path для файлів, які існують
+    """
+    candidates = [p for p in paths if p]
+    by_parent: dict[str, list[str]] = {}
+    for path_str in candidates:
+        by_parent.setdefault(os.path.dirname(path_str), []).append(path_str)
+
+    existing: set[str] = set()
+    for parent, items in by_parent.items():
+        try:
+            with os.scandir(parent or ".") as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            continue
+        existing.update(p for p in items if os.path.basename(p) in names)
+
+    return [Path(p) for p in candidates if p in existing]
+
+
+def compute_sha256(path: Path) -> str:
+    # file_digest читає у повторно використовуваний буфер (readinto) - без нового bytes на кожен блок
     with path.open("rb") as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            hasher.update(chunk)
-    return hasher.hexdigest()
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 
 def ensure_hash(meta: FileMeta) -> FileMeta:
@@ -166,13 +228,56 @@ def ensure_hash(meta: FileMeta) -> FileMeta:
     return meta
 
 
+def _hash_quietly(meta: FileMeta) -> None:
+    try:
+        ensure_hash(meta)
+    except Exception:
+        meta.sha256 = None
+
+
+class HashPool:
+    """
+    Пул потоків для SHA-256 (hashlib відпускає GIL під час хешування).
+
+    Файли можна подавати ще під час сканування - читання вмісту перекривається з обходом папок.
+    Помилки не перериваються - такі файли залишаються з sha256 = None.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        """
+        Args:
+            max_workers: Кількість потоків (None = 4 на ядро, не більше 32 - читання впирається в диск,
+                а кілька одночасних запитів дають ОС змогу впорядкувати та випереджально читати)
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hash")
+        self._futures: List[Future] = []
+
+    def submit(self, meta: FileMeta) -> None:
+        if not meta.sha256:
+            self._futures.append(self._pool.submit(_hash_quietly, meta))
+
+    def wait(self) -> None:
+        """Дочекатися хешів усіх поданих файлів."""
+        for future in self._futures:
+            future.result()
+        self._futures.clear()
+
+    def shutdown(self, cancel: bool = False) -> None:
+        self._pool.shutdown(wait=not cancel, cancel_futures=cancel)
+
+
 def detect_encoding(path: Path, chunk_size: int = 65536) -> str | None:
     try:
         with path.open("rb") as f:
             sample = f.read(chunk_size)
     except OSError:
         return None
-    if detect is None:
+    # chardet імпортується лише для текстових файлів - сканування та меню його не потребують
+    try:
+        from chardet import detect
+    except ImportError:  # pragma: no cover - fallback when dependency missing
         return None
     result = detect(sample)
     return result["encoding"] if result else None
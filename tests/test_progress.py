@@ -0,0 +1,47 @@
+"""Тести журналу обробки ProgressTracker."""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+pytest.importorskip("rich")
+
+from app.progress import ProgressTracker
+from app.scan import FileMeta
+
+
+def _meta(path, size: int, mtime: float, sha256: str) -> FileMeta:
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return FileMeta(path=path, size=size, ctime=mtime, mtime=mtime, sha256=sha256)
+
+
+def test_out_of_order_finalization_logs_each_files_own_metadata(tmp_path):
+    tracker = ProgressTracker({"extract": 1.0})
+    first = _meta(tmp_path / "first.txt", 10, 1_600_000_000, "a" * 64)
+    second = _meta(tmp_path / "second.txt", 20, 1_700_000_000, "b" * 64)
+
+    # Обидва файли стартують по черзі, а завершуються у зворотному порядку
+    tracker.set_current_file(name=first.path.name, path=str(first.path), stage="extract", status="processing")
+    first_id = tracker.current_file.hex_id
+    tracker.set_current_file(name=second.path.name, path=str(second.path), stage="extract", status="processing")
+    second_id = tracker.current_file.hex_id
+
+    tracker.set_file_status(str(second.path), stage="classify", status="success")
+    tracker.add_to_log(status="success", meta=second)
+    tracker.set_file_status(str(first.path), stage="classify", status="error", error_msg="boom")
+    tracker.add_to_log(status="error", meta=first)
+
+    second_entry, first_entry = tracker.file_log
+    assert (second_entry.filename, second_entry.size, second_entry.hex_id) == ("second.txt", 20, second_id)
+    assert (first_entry.filename, first_entry.size, first_entry.hex_id) == ("first.txt", 10, first_id)
+    assert first_entry.sha_hash == "aaaaaa" and second_entry.sha_hash == "bbbbbb"
+    assert "N/A" not in (first_entry.modified_date, second_entry.modified_date)
+    assert first_entry.modified_date != second_entry.modified_date
+
+    # Панель поточного файлу не повертається до вже завершеного першого файлу
+    assert tracker.current_file.name == "second.txt"
+    assert tracker.current_file.status == "success"
+    assert tracker.current_file.error_msg == ""
+    assert tracker.metrics.success_count == 1 and tracker.metrics.error_count == 1